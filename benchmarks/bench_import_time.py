@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the CLI and LinkedIn service entry points.
+
+Each scenario runs in a fresh interpreter, so module caches from earlier
+scenarios do not hide import cost. The full graph import (LangChain,
+LangGraph and the compiled graph) is the baseline. The lightweight entry
+points are reported as a fraction of it. With --max-ratio the script exits
+non-zero if any of them exceeds that fraction, so it can guard startup time
+in CI.
+
+Example:
+    python benchmarks/bench_import_time.py --repeat 5 --max-ratio 0.25
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, interpreter arguments); the first entry is the baseline
+SCENARIOS = (
+    ("graph", ["-c", "from deepresearch.graph import graph"]),
+    ("run --help", ["-m", "deepresearch.run", "--help"]),
+    ("import run", ["-c", "import deepresearch.run"]),
+    ("service", ["-c", "import deepresearch.linkedin_service"]),
+)
+
+def _run(args):
+    """Wall time of one fresh interpreter running args, in seconds."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=REPO_ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def _slowest_imports(args, limit):
+    """Modules with the largest cumulative import time, from python -X importtime."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup time of the deepresearch entry points")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario; the median is reported")
+    parser.add_argument("--max-ratio", type=float, help="Fail if an entry point takes more than this fraction of the graph import")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of each scenario")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first scenario is not charged for compilation
+    _run(SCENARIOS[0][1])
+
+    baseline = None
+    failures = []
+    print(f"{'scenario':>12} {'ms':>9} {'of graph':>9}")
+    for name, scenario_args in SCENARIOS:
+        seconds = statistics.median(_run(scenario_args) for _ in range(max(1, args.repeat)))
+        if baseline is None:
+            baseline = seconds
+        ratio = seconds / baseline
+        print(f"{name:>12} {seconds * 1000:>9.1f} {ratio:>9.0%}")
+        if args.max_ratio is not None and name != SCENARIOS[0][0] and ratio > args.max_ratio:
+            failures.append(name)
+        for microseconds, module in _slowest_imports(scenario_args, args.top):
+            print(f"{'':>12} {microseconds / 1000:>9.1f}  {module}")
+
+    if failures:
+        print(f"Startup too slow (over {args.max_ratio:.0%} of the graph import): {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for LinkedIn profile URL extraction from search results.
+
+Compares the previous per-field extractor (title and content scanned
+separately, raw matches deduplicated by string) with the single-pass
+extractor in deepresearch.utils on synthetic result batches. It reports
+throughput, the distinct URLs each returns and the distinct profiles those
+URLs name; more URLs than profiles means the same person was returned under
+several forms.
+
+Example:
+    python benchmarks/bench_linkedin_extraction.py --results 1000,10000 --repeat 5
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from deepresearch.profile_store import normalize_profile_id
+from deepresearch.utils import extract_result_linkedin_urls
+
+LEGACY_PATTERN = r'https?://(?:www\.)?linkedin\.com/in/[a-zA-Z0-9_-]+'
+
+# URL shapes seen in real search results, all referring to the profile slug
+URL_FORMS = (
+    "https://www.linkedin.com/in/{slug}",
+    "https://www.linkedin.com/in/{slug}/",
+    "https://linkedin.com/in/{slug}?trk=public_profile",
+    "https://uk.linkedin.com/in/{slug}",
+    "https://de.linkedin.com/in/{slug}/?originalSubdomain=de",
+    "www.linkedin.com/in/{slug}",
+    "https://www.linkedin.com/in/{upper}",
+)
+
+FILLER = ("Acme Corp announced today that its leadership team will expand into new markets. "
+          "The company builds infrastructure software for fintech and healthcare customers. ")
+
+def legacy_extract(results):
+    """Distinct profile URLs as found by the previous extractor."""
+    urls = set()
+    for result in results:
+        urls.update(re.findall(LEGACY_PATTERN, result.get("content", "")))
+        urls.update(re.findall(LEGACY_PATTERN, result.get("title", "")))
+    return urls
+
+def current_extract(results):
+    """Distinct profile URLs as found by the single-pass extractor."""
+    urls = set()
+    for result in results:
+        urls.update(extract_result_linkedin_urls(result))
+    return urls
+
+def make_results(count, seed=0):
+    """Synthetic search results with a mix of profile URL forms, encodings and locations."""
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        slug = f"person-{rng.randrange(count)}"
+        if rng.random() < 0.1:
+            slug = f"j%C3%B6rg-{rng.randrange(count)}"
+        url = rng.choice(URL_FORMS).format(slug=slug, upper=slug.upper())
+        placement = rng.random()
+        result = {
+            "title": f"Leadership team {i}",
+            "url": f"https://example.com/articles/{i}",
+            "content": FILLER * rng.randint(2, 8)
+        }
+        if placement < 0.2:
+            result["url"] = url
+        elif placement < 0.3:
+            result["title"] += f" | {url}"
+        elif placement < 0.8:
+            result["content"] += f" Profile: {url} "
+        results.append(result)
+    return results
+
+def _time(func, results, repeat):
+    """Best time over repeat runs, distinct URLs returned and distinct profiles they name."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = func(results)
+        best = min(best, time.perf_counter() - started)
+    return best, len(found), len({normalize_profile_id(url) for url in found})
+
+def _parse_levels(value):
+    return [int(level) for level in value.split(",") if level.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LinkedIn URL extraction from search results")
+    parser.add_argument("--results", type=_parse_levels, default=[1000, 10000], help="Comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per batch; the best time is reported")
+    args = parser.parse_args()
+
+    print(f"{'results':>8} {'extractor':>10} {'ms':>9} {'results/s':>12} {'urls':>7} {'profiles':>9}")
+    for count in args.results:
+        results = make_results(count)
+        for name, func in (("legacy", legacy_extract), ("current", current_extract)):
+            seconds, urls, profiles = _time(func, results, args.repeat)
+            print(f"{count:>8} {name:>10} {seconds * 1000:>9.1f} {count / seconds:>12.0f} {urls:>7} {profiles:>9}")
+
+if __name__ == "__main__":
+    main()
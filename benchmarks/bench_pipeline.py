@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the lead generation pipeline.
+
+Runs the compiled graph against deterministic local stand-ins, so no OpenAI,
+Tavily or Clay credentials are needed:
+
+- a fake chat model with configurable latency
+- a fake Tavily HTTP server
+- a fake Clay webhook that POSTs enriched profiles back to the real
+  /webhook/clay-callback endpoint of the LinkedIn service
+
+For each combination of concurrency level and loop count it reports runs/sec,
+p50/p99 latency per node, peak RSS and, with --trace-memory, peak Python heap.
+Each combination starts from empty profile, blob and search stores, and
+convergence-based early stopping is off so every run does all its loops.
+
+Example:
+    python benchmarks/bench_pipeline.py --concurrency 1,4,16 --loops 1,3 --runs 32
+"""
+
+import os
+import re
+import io
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+NODES = ("generate_query", "web_research", "summarize_leads", "reflect_on_leads", "finalize_leads",
+         "tavily_search", "send_linkedin_profile_to_clay")
+
+class BenchHTTPServer(ThreadingHTTPServer):
+    """Threading server with a listen backlog deep enough for the highest concurrency levels.
+
+    The default backlog of 5 makes connections queue in the kernel at high
+    concurrency, which shows up as a harness-made p99 tail.
+    """
+
+    request_queue_size = 256
+    daemon_threads = True
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "query"
+
+class FakeTavilyHandler(BaseHTTPRequestHandler):
+    """Deterministic stand-in for the Tavily search endpoint."""
+
+    latency = 0.0
+    content_bytes = 800
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("query", [""])[0]
+        max_results = int(params.get("max_results", ["5"])[0])
+        time.sleep(self.latency)
+        slug = _slug(query)
+        results = []
+        for i in range(max_results):
+            person = f"{slug}-{i}"
+            content = (f"Jane Doe {i} is VP of Engineering at Acme {i}. "
+                       f"Profile: https://www.linkedin.com/in/{person} ")
+            results.append({
+                "title": f"Leadership team {i} | {query}",
+                "url": f"https://example.com/{slug}/{i}",
+                "content": content.ljust(self.content_bytes, "x")
+            })
+        body = json.dumps({"results": results}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeClayHandler(BaseHTTPRequestHandler):
+    """Stand-in for the Clay webhook that calls back with an enriched profile."""
+
+    callback_delay = 0.05
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        body = b'{"status": "queued"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        threading.Timer(self.callback_delay, _post_callback, args=(payload,)).start()
+
+    def log_message(self, format, *args):
+        pass
+
+def _post_callback(payload):
+    profile_url = payload.get("url", "")
+    profile = {
+        "url": profile_url,
+        "name": profile_url.rstrip("/").split("/")[-1].replace("-", " ").title(),
+        "title": "VP of Engineering",
+        "company": "Acme"
+    }
+    request = urllib.request.Request(
+        payload["callback_url"], data=json.dumps(profile).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST"
+    )
+    try:
+        urllib.request.urlopen(request, timeout=10).read()
+    except OSError:
+        pass
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def make_fake_chat_model(latency: float):
+    """Build a factory for deterministic chat models with the given latency."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class FakeChatModel(BaseChatModel):
+        latency: float = 0.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake-chat"
+
+        def _respond(self, messages) -> ChatResult:
+            system, human = messages[0].content, messages[-1].content
+            if '"queries"' in system:
+                match = re.search(r"(\d+) (?:follow-up search )?queries", human)
+                count = int(match.group(1)) if match else 1
+                criteria = re.search(r"(?:search for is|results for): (.+)", system)
+                topic = _slug(criteria.group(1) if criteria else human)
+                content = json.dumps({"queries": [f"{topic} leads angle {i} {len(human) % 97}" for i in range(count)]})
+            elif '"leads"' in system:
+                urls = sorted(set(re.findall(r"https://www\.linkedin\.com/in/[a-z0-9-]+", human)))
+                content = json.dumps({"leads": [
+                    {"name": url.rsplit("/", 1)[-1].replace("-", " ").title(), "title": "VP of Engineering",
+                     "company": "Acme", "linkedin_url": url, "source_urls": []}
+                    for url in urls
+                ]})
+            else:
+                content = "1. Jane Doe - VP of Engineering at Acme"
+            input_tokens = sum(len(message.content) for message in messages) // 4
+            output_tokens = len(content) // 4
+            message = AIMessage(content=content, usage_metadata={
+                "input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            })
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.latency)
+            return self._respond(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(self.latency)
+            return self._respond(messages)
+
+    return lambda model, api_key, response_format, cache: FakeChatModel(latency=latency, cache=cache)
+
+def _use_fresh_stores(directory: str):
+    """Point the profile, blob and search stores at an empty directory, so levels do not share data."""
+    from deepresearch import blob_store, cache, profile_store
+
+    profile_store._store = profile_store.ProfileStore(os.path.join(directory, "linkedin_profiles", "profiles.db"))
+    blob_store._blob_store = blob_store.BlobStore(os.path.join(directory, "blobs.sqlite"))
+    cache._search_cache = cache.DiskCache(os.path.join(directory, "search_cache.db"),
+                                          cache.SEARCH_CACHE_TTL, cache.SEARCH_CACHE_MAX_ENTRIES)
+
+def _parse_levels(value: str):
+    return [int(level) for level in value.split(",") if level.strip()]
+
+def _max_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1e3
+
+def _percentile_row(spans, node):
+    counters = spans.get(node)
+    if not counters or not counters["calls"]:
+        return "-"
+    return f"{counters['p50_seconds'] * 1000:.1f}/{counters['p99_seconds'] * 1000:.1f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the lead generation pipeline")
+    parser.add_argument("--concurrency", type=_parse_levels, default=[1, 4, 16], help="Comma-separated concurrency levels")
+    parser.add_argument("--loops", type=_parse_levels, default=[1, 3], help="Comma-separated max research loop counts")
+    parser.add_argument("--runs", type=int, default=16, help="Runs per concurrency level and loop count")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread", help="Drive the graph with invoke on threads or ainvoke on one event loop")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake chat model latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="Fake Tavily latency in seconds")
+    parser.add_argument("--clay-callback-delay", type=float, default=0.05, help="Delay before the fake Clay webhook calls back")
+    parser.add_argument("--search-cache", action="store_true", help="Keep the search cache enabled (disabled by default)")
+    parser.add_argument("--trace-memory", action="store_true", help="Track peak Python heap with tracemalloc (slows the runs down)")
+    parser.add_argument("--json", type=str, help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    # Isolate all on-disk state in a scratch directory before importing the package
+    workdir = tempfile.mkdtemp(prefix="deepresearch-bench-")
+    os.chdir(workdir)
+    os.environ["DEEPRESEARCH_CACHE_DIR"] = os.path.join(workdir, "cache")
+    if not args.search_cache:
+        os.environ["SEARCH_CACHE_TTL"] = "0"
+
+    FakeTavilyHandler.latency = args.search_latency
+    FakeClayHandler.callback_delay = args.clay_callback_delay
+    tavily = _serve(BenchHTTPServer(("127.0.0.1", 0), FakeTavilyHandler))
+    clay = _serve(BenchHTTPServer(("127.0.0.1", 0), FakeClayHandler))
+    os.environ["TAVILY_SEARCH_URL"] = f"http://127.0.0.1:{tavily.server_port}/search"
+    os.environ["TAVILY_API_KEY"] = "offline-benchmark"
+    os.environ["CLAY_WEBHOOK_URL"] = f"http://127.0.0.1:{clay.server_port}/webhook"
+
+    from werkzeug.serving import make_server
+    from deepresearch.batch import arun_batch, run_batch
+    from deepresearch.graph import get_graph
+    from deepresearch.ingest import get_ingest_queue
+    from deepresearch.linkedin_service import app
+    from deepresearch.llm import set_chat_model_factory
+    from deepresearch.metrics import metrics
+
+    # Every run does all of its loops, so the loops dimension measures loop cost
+    graph = get_graph().with_config(configurable={"convergence_patience": 0})
+
+    # Per-request access logs would dominate the output
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    service = make_server("127.0.0.1", 0, app, threaded=True)
+    _serve(service)
+    os.environ["CALLBACK_URL"] = f"http://127.0.0.1:{service.server_port}/webhook/clay-callback"
+    set_chat_model_factory(make_fake_chat_model(args.llm_latency))
+
+    results = []
+    header = f"{'loops':>5} {'conc':>5} {'runs/s':>8} {'rss MB':>8} {'heap MB':>8}  " + "  ".join(f"{node[:14]:>14}" for node in NODES)
+    print("p50/p99 latency per node in ms")
+    print(header)
+    for loops in args.loops:
+        for concurrency in args.concurrency:
+            _use_fresh_stores(tempfile.mkdtemp(prefix=f"l{loops}-c{concurrency}-", dir=workdir))
+            metrics.reset()
+            jobs = [{"id": f"l{loops}-c{concurrency}-{i}", "lead_criteria": f"VP of Engineering cohort {i}",
+                     "max_loops": loops} for i in range(args.runs)]
+            if args.trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            if args.mode == "async":
+                counts = asyncio.run(arun_batch(iter(jobs), io.StringIO(), concurrency=concurrency, graph=graph))
+            else:
+                counts = run_batch(iter(jobs), io.StringIO(), workers=concurrency, graph=graph)
+            elapsed = time.perf_counter() - started
+            peak_traced_mb = None
+            if args.trace_memory:
+                peak_traced_mb = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+
+            spans = metrics.snapshot()["spans"]
+            row = {
+                "loops": loops,
+                "concurrency": concurrency,
+                "runs": args.runs,
+                "failed": counts["failed"],
+                "elapsed_seconds": elapsed,
+                "runs_per_second": args.runs / elapsed,
+                "peak_traced_mb": peak_traced_mb,
+                "max_rss_mb": _max_rss_mb(),
+                "nodes": {node: spans[node] for node in NODES if node in spans}
+            }
+            results.append(row)
+            memory = f"{peak_traced_mb:.1f}" if peak_traced_mb is not None else "-"
+            print(f"{loops:>5} {concurrency:>5} {row['runs_per_second']:>8.2f} {row['max_rss_mb']:>8.1f} {memory:>8}  "
+                  + "  ".join(f"{_percentile_row(spans, node):>14}" for node in NODES))
+            if counts["failed"]:
+                print(f"      {counts['failed']} runs failed", file=sys.stderr)
+
+            # Let outstanding Clay callbacks land before the next level gets fresh stores
+            time.sleep(args.clay_callback_delay + 0.2)
+            ingest_queue = get_ingest_queue()
+            if ingest_queue is not None:
+                ingest_queue.flush()
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"mode": args.mode, "results": results}, f, indent=2)
+
+    service.shutdown()
+    tavily.shutdown()
+    clay.shutdown()
+
+if __name__ == "__main__":
+    main()
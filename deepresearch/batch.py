@@ -0,0 +1,189 @@
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, IO, Iterator, Optional
+
+from deepresearch.checkpoint import ainvoke_resumable, invoke_resumable
+
+logger = logging.getLogger(__name__)
+
+def read_criteria(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Read lead criteria jobs from a JSONL stream.
+
+    Each line is either a JSON object with a "lead_criteria" key (and an
+    optional "max_loops", "enrichment_wait_seconds" and "id"), a JSON string,
+    or plain text criteria.
+    Blank lines are skipped.
+
+    Args:
+        stream: Text stream to read from
+
+    Yields:
+        Job dictionaries with id, lead_criteria and optional max_loops
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line
+        if isinstance(item, str):
+            item = {"lead_criteria": item}
+        if not isinstance(item, dict) or not item.get("lead_criteria"):
+            logger.warning(f"Skipping line {line_number}: no lead_criteria found")
+            continue
+        item.setdefault("id", str(line_number))
+        yield item
+
+def job_config(job: Dict[str, Any], max_loops: int, batch_id: Optional[str] = None,
+                enrichment_wait: float = 0.0) -> Dict[str, Any]:
+    """
+    Build the runnable config for a batch or API job.
+
+    Args:
+        job: Job dictionary with an id and optional max_loops and enrichment_wait_seconds
+        max_loops: Maximum research loops if the job does not set them
+        batch_id: Identifier of the batch; the job's checkpoint thread is scoped to it
+        enrichment_wait: Seconds to wait for pending enrichments if the job does not set them
+
+    Returns:
+        Config for invoke_resumable
+    """
+    configurable = {
+        "max_web_research_loops": job.get("max_loops", max_loops),
+        "enrichment_wait_seconds": job.get("enrichment_wait_seconds", enrichment_wait),
+        "run_id": job["id"]
+    }
+    if batch_id:
+        configurable["thread_id"] = f"{batch_id}:{job['id']}"
+    return {"configurable": configurable}
+
+def finish_record(record: Dict[str, Any], started: float, result: Optional[Dict[str, Any]] = None,
+                   error: Optional[Exception] = None) -> Dict[str, Any]:
+    """
+    Fill in the outcome of a batch or API job.
+
+    Args:
+        record: Job record to update
+        started: time.monotonic() when the job started
+        result: Final graph state if the job succeeded
+        error: Exception if the job failed
+
+    Returns:
+        The updated record
+    """
+    if error is None:
+        record.update(status="succeeded", running_summary=result["running_summary"], leads=result.get("leads", []),
+                      stop_reason=result.get("stop_reason"))
+    else:
+        logger.error(f"Lead generation failed for job {record['id']}: {str(error)}")
+        record.update(status="failed", error=str(error))
+    record["duration_seconds"] = round(time.monotonic() - started, 3)
+    return record
+
+def _write_record(output: IO[str], record: Dict[str, Any], counts: Dict[str, int]) -> None:
+    """Stream a finished job to the output and update the counts."""
+    counts[record["status"]] += 1
+    output.write(json.dumps(record) + "\n")
+    output.flush()
+    logger.info(f"Job {record['id']} {record['status']} in {record['duration_seconds']}s")
+
+def run_batch(jobs: Iterator[Dict[str, Any]], output: IO[str], workers: int = 4,
+              max_loops: int = 3, graph: Optional[Any] = None, batch_id: Optional[str] = None,
+              enrichment_wait: float = 0.0) -> Dict[str, int]:
+    """
+    Run lead generation for many criteria concurrently.
+
+    All runs share the same process, so HTTP sessions, caches and the compiled
+    graph are reused across criteria. Each result is written to output as a
+    JSON line as soon as its run completes.
+
+    Args:
+        jobs: Job dictionaries as produced by read_criteria
+        output: Text stream to write JSONL results to
+        workers: Number of runs to execute concurrently
+        max_loops: Default maximum research loops for jobs that do not set one
+        graph: Compiled graph to run (defaults to deepresearch.graph.graph)
+        batch_id: Identifier of the batch; with a checkpointed graph, rerunning the
+            same batch id resumes interrupted jobs and skips finished ones
+        enrichment_wait: Default seconds each research loop waits for pending Clay
+            enrichments, for jobs that do not set enrichment_wait_seconds
+
+    Returns:
+        Dictionary with succeeded and failed counts
+    """
+    if graph is None:
+        from deepresearch.graph import get_graph
+        graph = get_graph()
+
+    counts = {"succeeded": 0, "failed": 0}
+
+    def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.monotonic()
+        record = {"id": job["id"], "lead_criteria": job["lead_criteria"]}
+        try:
+            result = invoke_resumable(graph, {"research_topic": job["lead_criteria"]},
+                                      job_config(job, max_loops, batch_id, enrichment_wait))
+        except Exception as e:
+            return finish_record(record, started, error=e)
+        return finish_record(record, started, result=result)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(run_job, job) for job in jobs]
+        for future in as_completed(futures):
+            _write_record(output, future.result(), counts)
+
+    return counts
+
+async def arun_batch(jobs: Iterator[Dict[str, Any]], output: IO[str], concurrency: int = 16,
+                     max_loops: int = 3, graph: Optional[Any] = None, batch_id: Optional[str] = None,
+                     enrichment_wait: float = 0.0) -> Dict[str, int]:
+    """
+    Run lead generation for many criteria concurrently on one event loop.
+
+    Uses the async graph nodes via graph.ainvoke, so concurrency is bounded
+    by a semaphore rather than by a thread per run.
+
+    Args:
+        jobs: Job dictionaries as produced by read_criteria
+        output: Text stream to write JSONL results to
+        concurrency: Maximum number of runs in flight
+        max_loops: Default maximum research loops for jobs that do not set one
+        graph: Compiled graph to run (defaults to deepresearch.graph.graph)
+        batch_id: Identifier of the batch; with a checkpointed graph, rerunning the
+            same batch id resumes interrupted jobs and skips finished ones
+        enrichment_wait: Default seconds each research loop waits for pending Clay
+            enrichments, for jobs that do not set enrichment_wait_seconds
+
+    Returns:
+        Dictionary with succeeded and failed counts
+    """
+    if graph is None:
+        from deepresearch.graph import get_graph
+        graph = get_graph()
+
+    counts = {"succeeded": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.monotonic()
+            record = {"id": job["id"], "lead_criteria": job["lead_criteria"]}
+            try:
+                result = await ainvoke_resumable(graph, {"research_topic": job["lead_criteria"]},
+                                                 job_config(job, max_loops, batch_id, enrichment_wait))
+            except Exception as e:
+                return finish_record(record, started, error=e)
+            return finish_record(record, started, result=result)
+
+    for next_record in asyncio.as_completed([run_job(job) for job in jobs]):
+        _write_record(output, await next_record, counts)
+
+    from deepresearch.http_client import aclose_async_clients
+    await aclose_async_clients()
+    return counts
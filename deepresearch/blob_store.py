@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from deepresearch.cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# SQLite database holding search results and profiles referenced from graph state
+BLOB_STORE_PATH = os.environ.get("DEEPRESEARCH_BLOB_STORE_PATH", os.path.join(CACHE_DIR, "blobs.sqlite"))
+
+# Seconds a blob is kept after it was last stored; older blobs are pruned when
+# the store is opened (0 keeps them forever)
+BLOB_STORE_TTL = float(os.environ.get("DEEPRESEARCH_BLOB_STORE_TTL", str(30 * 24 * 3600)))
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+def content_digest(data: bytes) -> str:
+    """
+    Get the address of content in the blob store.
+
+    Args:
+        data: Raw content
+
+    Returns:
+        Hex SHA-256 digest of the content
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def json_digest(value: Any) -> str:
+    """
+    Get the address a JSON value is stored under, without storing it.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        Digest that put_json returns for the value
+    """
+    return content_digest(_encode_json(value))
+
+class BlobStore:
+    """
+    Content-addressed store for bulky run data, keyed by SHA-256 digest.
+
+    Graph state carries digests instead of formatted search results and
+    profile data, so each node's state update and each checkpoint stays small
+    however many loops a run takes. Identical content is stored once and
+    shared across runs and processes; it is zlib-compressed on disk.
+
+    Blobs not stored again for ttl_seconds are pruned when the store is opened,
+    so the TTL must cover the longest time a checkpointed run may be resumed.
+    """
+
+    def __init__(self, db_path: str = BLOB_STORE_PATH, ttl_seconds: float = BLOB_STORE_TTL):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " digest TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS blobs_created_at ON blobs (created_at)")
+        self._conn.commit()
+        if ttl_seconds > 0:
+            self.prune(ttl_seconds)
+
+    def put(self, data: bytes) -> str:
+        """
+        Store content under its digest; storing the same content again only renews it.
+
+        Args:
+            data: Raw content
+
+        Returns:
+            The content's digest
+        """
+        digest = content_digest(data)
+        with self._lock:
+            with self._conn:
+                # Renew existing content so blobs still in use are not pruned
+                cursor = self._conn.execute("UPDATE blobs SET created_at = ? WHERE digest = ?", (time.time(), digest))
+                if cursor.rowcount == 0:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO blobs (digest, data, created_at) VALUES (?, ?, ?)",
+                        (digest, zlib.compress(data), time.time())
+                    )
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        Get stored content.
+
+        Args:
+            digest: Digest returned by put
+
+        Returns:
+            The content, or None if it is not in the store
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Get several stored contents in one query.
+
+        Args:
+            digests: Digests returned by put
+
+        Returns:
+            Content keyed by digest, for the digests found in the store
+        """
+        digests = list(dict.fromkeys(digests))
+        found: Dict[str, bytes] = {}
+        # Stay under SQLite's limit on bound parameters
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT digest, data FROM blobs WHERE digest IN ({placeholders})", chunk
+                ).fetchall()
+            found.update((digest, zlib.decompress(data)) for digest, data in rows)
+        return found
+
+    def put_text(self, text: str) -> str:
+        """Store a string and return its digest."""
+        return self.put(text.encode("utf-8"))
+
+    def get_text(self, digest: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a stored string, or default if it is not in the store."""
+        data = self.get(digest)
+        return data.decode("utf-8") if data is not None else default
+
+    def put_json(self, value: Any) -> str:
+        """Store a JSON value and return its digest (the same as json_digest(value))."""
+        return self.put(_encode_json(value))
+
+    def get_json(self, digest: str, default: Any = None) -> Any:
+        """Get a stored JSON value, or default if it is not in the store."""
+        data = self.get(digest)
+        return json.loads(data) if data is not None else default
+
+    def get_json_many(self, digests: Iterable[str]) -> Dict[str, Any]:
+        """Get several stored JSON values, keyed by digest."""
+        return {digest: json.loads(data) for digest, data in self.get_many(digests).items()}
+
+    def prune(self, max_age: float) -> int:
+        """
+        Delete blobs not stored within max_age seconds.
+
+        Args:
+            max_age: Age in seconds beyond which blobs are deleted
+
+        Returns:
+            Number of blobs deleted
+        """
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM blobs WHERE created_at < ?", (time.time() - max_age,))
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} blobs older than {max_age:.0f}s")
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get store size.
+
+        Returns:
+            Dictionary with the number of blobs and their compressed bytes
+        """
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {"blobs": count, "bytes": size}
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+def get_blob_store() -> BlobStore:
+    """
+    Get the process-wide blob store, opening it on first use.
+
+    Returns:
+        Shared BlobStore
+    """
+    global _blob_store
+    if _blob_store is None:
+        with _blob_store_lock:
+            if _blob_store is None:
+                _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Directory for local caches
+CACHE_DIR = os.environ.get("DEEPRESEARCH_CACHE_DIR", ".deepresearch_cache")
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+
+    Args:
+        parts: Values identifying the cached item
+
+    Returns:
+        Hex SHA-256 digest of the serialized parts
+    """
+    serialized = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+class DiskCache:
+    """
+    On-disk key/value cache with TTL expiry and size-bounded LRU eviction.
+
+    Entries are JSON values stored in SQLite, so the cache is shared across
+    runs and processes. Hit, miss and eviction counters are kept per instance.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value, refreshing its LRU position.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            with self._conn:
+                if now - created_at > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self.expired += 1
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries beyond max_entries.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE key IN"
+                        " (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for tuning TTL and size.
+
+        Returns:
+            Dictionary with hits, misses, expired, evictions, hit_rate and size
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": size,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries
+            }
+
+# Search result cache settings
+SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.db"))
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+
+_search_cache: Optional[DiskCache] = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> DiskCache:
+    """
+    Get the process-wide search result cache, opening it on first use.
+
+    Returns:
+        Shared DiskCache for search results
+    """
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = DiskCache(SEARCH_CACHE_PATH, SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES)
+    return _search_cache
+
+# LLM response cache settings
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.db"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+_llm_cache: Optional[DiskCache] = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_response_cache() -> DiskCache:
+    """
+    Get the process-wide LLM response cache, opening it on first use.
+
+    Returns:
+        Shared DiskCache for LLM responses
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = DiskCache(LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    return _llm_cache
\ No newline at end of file
@@ -0,0 +1,191 @@
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from deepresearch.blob_store import BLOB_STORE_TTL
+from deepresearch.cache import CACHE_DIR
+from deepresearch.state import SummaryStateOutput
+
+logger = logging.getLogger(__name__)
+
+# SQLite database holding the state of every checkpointed run after each node
+CHECKPOINT_PATH = os.environ.get("DEEPRESEARCH_CHECKPOINT_PATH", os.path.join(CACHE_DIR, "checkpoints.sqlite"))
+
+# Seconds after its last run a checkpoint thread is deleted; the same as the blob
+# store TTL, since older threads refer to pruned blobs and cannot be resumed
+CHECKPOINT_TTL = BLOB_STORE_TTL
+
+_checkpointer: Optional[Any] = None
+_checkpointer_lock = threading.Lock()
+
+def _ensure_directory(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+def _thread_table(connection: sqlite3.Connection) -> None:
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS checkpoint_threads ("
+        " thread_id TEXT PRIMARY KEY,"
+        " updated_at REAL NOT NULL)"
+    )
+
+def _touch_thread(thread_id: str, path: str = CHECKPOINT_PATH) -> None:
+    """Record that a checkpoint thread ran, renewing it for CHECKPOINT_TTL."""
+    if not thread_id:
+        return
+    _ensure_directory(path)
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        with connection:
+            _thread_table(connection)
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoint_threads (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time())
+            )
+    finally:
+        connection.close()
+
+def prune_checkpoints(max_age: float = CHECKPOINT_TTL, path: str = CHECKPOINT_PATH) -> int:
+    """
+    Delete the checkpoints of threads that have not run within max_age seconds.
+
+    Threads checkpointed before their runs were tracked are kept for max_age
+    from the first prune.
+
+    Args:
+        max_age: Age in seconds beyond which threads are deleted (0 keeps them)
+        path: Checkpoint database path
+
+    Returns:
+        Number of threads deleted
+    """
+    if max_age <= 0 or not os.path.exists(path):
+        return 0
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        with connection:
+            _thread_table(connection)
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            now = time.time()
+            if "checkpoints" in tables:
+                connection.execute(
+                    "INSERT OR IGNORE INTO checkpoint_threads (thread_id, updated_at)"
+                    " SELECT DISTINCT thread_id, ? FROM checkpoints", (now,)
+                )
+            expired = [(row[0],) for row in connection.execute(
+                "SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?", (now - max_age,)
+            )]
+            for table in ("checkpoints", "writes", "checkpoint_threads"):
+                if table in tables:
+                    connection.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+    finally:
+        connection.close()
+    if expired:
+        logger.info(f"Pruned {len(expired)} checkpoint threads not run for {max_age:.0f}s")
+    return len(expired)
+
+def get_checkpointer() -> Any:
+    """
+    Get the process-wide SQLite checkpointer for sync graph runs, opening it on first use.
+
+    Expired threads are pruned when it is opened.
+
+    Returns:
+        Shared SqliteSaver
+    """
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+                _ensure_directory(CHECKPOINT_PATH)
+                prune_checkpoints()
+                connection = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False, timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+                _checkpointer = SqliteSaver(connection)
+    return _checkpointer
+
+@asynccontextmanager
+async def async_checkpointer(path: str = CHECKPOINT_PATH) -> AsyncIterator[Any]:
+    """
+    Open an SQLite checkpointer for async graph runs on the current event loop.
+
+    Expired threads are pruned when it is opened.
+
+    Args:
+        path: Checkpoint database path
+
+    Yields:
+        AsyncSqliteSaver, closed when the context exits
+    """
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    _ensure_directory(path)
+    await asyncio.to_thread(prune_checkpoints, CHECKPOINT_TTL, path)
+    async with AsyncSqliteSaver.from_conn_string(path) as saver:
+        yield saver
+
+def _run_output(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Restrict checkpointed state to the graph's output keys."""
+    return {key: values[key] for key in SummaryStateOutput.__annotations__ if key in values}
+
+def _thread_id(config: Dict[str, Any]) -> str:
+    return str(config.get("configurable", {}).get("thread_id", ""))
+
+def invoke_resumable(graph: Any, inputs: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Invoke a graph, resuming from its last checkpoint if the run was interrupted.
+
+    The run is identified by configurable.thread_id. A run that was interrupted
+    continues from the node after the last completed one, and a run that already
+    finished returns its checkpointed output without calling any node. Graphs
+    compiled without a checkpointer are simply invoked.
+
+    Args:
+        graph: Compiled graph
+        inputs: Graph input, used only when the run has no checkpoint yet
+        config: Runnable config with configurable.thread_id
+
+    Returns:
+        Graph output
+    """
+    if getattr(graph, "checkpointer", None) is None:
+        return graph.invoke(inputs, config)
+    _touch_thread(_thread_id(config))
+    snapshot = graph.get_state(config)
+    if snapshot.next:
+        logger.info(f"Resuming run {_thread_id(config)} at {', '.join(snapshot.next)}")
+        return graph.invoke(None, config)
+    if snapshot.values:
+        logger.info(f"Run {_thread_id(config)} already completed; using its checkpointed result")
+        return _run_output(snapshot.values)
+    return graph.invoke(inputs, config)
+
+async def ainvoke_resumable(graph: Any, inputs: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of invoke_resumable.
+
+    Args:
+        graph: Compiled graph
+        inputs: Graph input, used only when the run has no checkpoint yet
+        config: Runnable config with configurable.thread_id
+
+    Returns:
+        Graph output
+    """
+    if getattr(graph, "checkpointer", None) is None:
+        return await graph.ainvoke(inputs, config)
+    await asyncio.to_thread(_touch_thread, _thread_id(config))
+    snapshot = await graph.aget_state(config)
+    if snapshot.next:
+        logger.info(f"Resuming run {_thread_id(config)} at {', '.join(snapshot.next)}")
+        return await graph.ainvoke(None, config)
+    if snapshot.values:
+        logger.info(f"Run {_thread_id(config)} already completed; using its checkpointed result")
+        return _run_output(snapshot.values)
+    return await graph.ainvoke(inputs, config)
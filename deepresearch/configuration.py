@@ -18,10 +18,32 @@ class Configuration(BaseModel):
     clay_webhook_url: Optional[str] = Field(
         default_factory=lambda: os.environ.get("CLAY_WEBHOOK_URL")
     )
+    max_concurrent_enrichments: int = Field(default=8)
+    incremental_summary: bool = Field(default=True)
+    queries_per_loop: int = Field(default=3)
+    max_results_per_query: int = Field(default=5)
+    # Stop early after convergence_patience consecutive loops that each found fewer
+    # than min_marginal_yield new URLs, profiles and leads combined (0 disables)
+    convergence_patience: int = Field(default=2)
+    min_marginal_yield: int = Field(default=1)
+    # Tokens of the context window kept free for the model's reply
+    completion_token_reserve: int = Field(default=2048)
+    # Rank search results locally and drop those scoring below min_relevance_score
+    # before they reach the summarizer (max_ranked_sources=0 keeps all that pass)
+    relevance_filter: bool = Field(default=True)
+    min_relevance_score: float = Field(default=0.3)
+    max_ranked_sources: int = Field(default=10)
+    # Seconds web_research waits for pending Clay enrichments to call back
+    # (0 only picks up those that have already arrived)
+    enrichment_wait_seconds: float = Field(default=0.0)
+    # Serve repeated query-generation and reflection prompts from the local LLM
+    # response cache; llm_cache_bypass skips cached responses but stores new ones
+    llm_cache: bool = Field(default_factory=lambda: os.environ.get("LLM_CACHE", "").lower() in ("1", "true", "yes"))
+    llm_cache_bypass: bool = Field(default_factory=lambda: os.environ.get("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes"))
     
     @classmethod
     def from_runnable_config(cls, config):
         """Create a configuration from a runnable config."""
-        if hasattr(config, "configurable"):
-            return config.configurable
-        return Configuration()
\ No newline at end of file
+        configurable = (config or {}).get("configurable", {})
+        values = {k: v for k, v in configurable.items() if k in cls.model_fields and v is not None}
+        return cls(**values)
\ No newline at end of file
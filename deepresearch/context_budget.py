@@ -0,0 +1,189 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Context windows (prompt + completion tokens) by model name prefix
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-3.5-turbo": 16385,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4": 8192,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokens added by the chat format per message, plus a margin for the reply priming
+TOKENS_PER_MESSAGE = 4
+PROMPT_OVERHEAD_TOKENS = 16
+
+# Smallest remainder worth filling with a truncated item
+MIN_PARTIAL_TOKENS = 64
+
+DEFAULT_ENCODING = "cl100k_base"
+
+def context_window(model: str) -> int:
+    """
+    Get the context window of a model.
+
+    Args:
+        model: OpenAI model name
+
+    Returns:
+        Maximum prompt plus completion tokens, matched by longest name prefix
+    """
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    """Tokenizer for a model, loaded once per model; None if tiktoken or its encoding is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed; estimating tokens as characters / 4")
+        return None
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline or behind a proxy
+        logger.warning(f"Could not load the tiktoken encoding ({str(e)}); estimating tokens as characters / 4")
+        return None
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of text with the model's tokenizer.
+
+    Counts are cached, since the same sources and profiles are measured
+    repeatedly while prompts are assembled.
+
+    Args:
+        text: Text to measure
+        model: OpenAI model name (defaults to the cl100k_base encoding)
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None, suffix: str = "...") -> str:
+    """
+    Truncate text to at most max_tokens tokens, including the suffix.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+        model: OpenAI model name (defaults to the cl100k_base encoding)
+        suffix: Marker appended when text is cut
+
+    Returns:
+        The original text if it fits, otherwise its truncated prefix plus suffix
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(suffix, model))
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:keep * 4] + suffix
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + suffix
+
+def messages_tokens(texts: Sequence[str], model: Optional[str] = None) -> int:
+    """
+    Count the prompt tokens of chat messages with the given contents.
+
+    Args:
+        texts: Message contents
+        model: OpenAI model name
+
+    Returns:
+        Tokens including per-message formatting overhead
+    """
+    return sum(count_tokens(text, model) + TOKENS_PER_MESSAGE for text in texts) + PROMPT_OVERHEAD_TOKENS
+
+class PromptSection(NamedTuple):
+    """A part of a prompt competing for the token budget.
+
+    Sections are served in priority order (lower first). Each is first
+    guaranteed up to share of the budget, then leftover budget goes to
+    sections in priority order.
+    """
+    name: str
+    items: List[str]
+    priority: int
+    share: float
+    separator: str = "\n\n"
+
+def fit_sections(sections: Sequence[PromptSection], budget: int, model: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Fit prompt sections into a token budget by priority.
+
+    Whole items are kept in order while they fit; the first item that does
+    not fit is truncated if enough room remains, and later items are dropped.
+
+    Args:
+        sections: Sections to fit
+        budget: Total tokens available to the sections
+        model: OpenAI model name
+
+    Returns:
+        Kept items of each section (the last possibly truncated), keyed by
+        section name; join them with the section separator. With no budget
+        left, every section is empty.
+    """
+    if budget <= 0:
+        logger.warning(f"Fixed prompt text exceeds the context window by {-budget} tokens; dropping "
+                       + ", ".join(section.name for section in sections))
+        return {section.name: [] for section in sections}
+    ordered = sorted(sections, key=lambda section: section.priority)
+    costs = {
+        section.name: [count_tokens(item, model) + count_tokens(section.separator, model) for item in section.items]
+        for section in ordered
+    }
+    remaining = budget
+    allowances = {}
+
+    # First pass: guaranteed share for each section
+    for section in ordered:
+        grant = max(0, min(sum(costs[section.name]), int(budget * section.share), remaining))
+        allowances[section.name] = grant
+        remaining -= grant
+
+    # Second pass: leftover budget by priority
+    for section in ordered:
+        extra = max(0, min(sum(costs[section.name]) - allowances[section.name], remaining))
+        allowances[section.name] += extra
+        remaining -= extra
+
+    fitted = {}
+    for section in ordered:
+        allowance = allowances[section.name]
+        kept = []
+        for item, cost in zip(section.items, costs[section.name]):
+            if cost <= allowance:
+                kept.append(item)
+                allowance -= cost
+                continue
+            if allowance >= MIN_PARTIAL_TOKENS:
+                kept.append(truncate_to_tokens(item, allowance - count_tokens(section.separator, model), model))
+            break
+        fitted[section.name] = kept
+    return fitted
@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, Iterable, List, Tuple
+
+from deepresearch.profile_store import get_profile_store, normalize_profile_id
+
+logger = logging.getLogger(__name__)
+
+# How often waiting runs re-check the profile store for profiles received by
+# another process (callbacks received in-process wake waiters immediately)
+ENRICHMENT_POLL_INTERVAL = float(os.environ.get("ENRICHMENT_POLL_INTERVAL", "1.0"))
+
+class EnrichmentWaiters:
+    """
+    Futures for Clay enrichments that runs are waiting on, keyed by profile id.
+
+    The callback receiver resolves them after profiles are written to the
+    store, so a run in the same process wakes up as soon as its profile
+    arrives. Waiters also poll the store, which picks up profiles received by a
+    LinkedIn service running in another process, and closes the race with a
+    callback that landed before the future was registered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # profile id -> (future, number of waiters)
+        self._futures: Dict[str, Tuple[Future, int]] = {}
+
+    def _acquire(self, profile_ids: Iterable[str]) -> Dict[str, Future]:
+        futures = {}
+        with self._lock:
+            for profile_id in profile_ids:
+                future, waiters = self._futures.get(profile_id, (None, 0))
+                if future is None:
+                    future = Future()
+                self._futures[profile_id] = (future, waiters + 1)
+                futures[profile_id] = future
+        return futures
+
+    def _release(self, futures: Dict[str, Future]) -> None:
+        with self._lock:
+            for profile_id, acquired in futures.items():
+                future, waiters = self._futures.get(profile_id, (None, 0))
+                if future is not acquired:
+                    # Already resolved, and possibly replaced by a newer waiter's future
+                    continue
+                if waiters <= 1:
+                    self._futures.pop(profile_id, None)
+                else:
+                    self._futures[profile_id] = (future, waiters - 1)
+
+    def resolve(self, profiles: Iterable[Dict[str, Any]]) -> None:
+        """
+        Wake runs waiting on these profiles.
+
+        Args:
+            profiles: Profile data just written to the profile store
+        """
+        with self._lock:
+            resolved = []
+            for profile in profiles:
+                entry = self._futures.pop(normalize_profile_id(profile.get("url", "")), None)
+                if entry is not None:
+                    resolved.append((entry[0], profile))
+        for future, profile in resolved:
+            if not future.done():
+                future.set_result(profile)
+
+    def pending(self) -> int:
+        """Number of profiles runs are currently waiting on."""
+        with self._lock:
+            return len(self._futures)
+
+    @staticmethod
+    def _collect(futures: Dict[str, Future], completed: Dict[str, Dict[str, Any]]) -> None:
+        """Add profiles whose futures resolved or that are now in the store."""
+        store = get_profile_store()
+        for profile_id, future in futures.items():
+            if profile_id in completed:
+                continue
+            if future.done():
+                completed[profile_id] = future.result()
+                continue
+            profile = store.get(profile_id)
+            if profile is not None:
+                completed[profile_id] = profile
+
+    def wait(self, profile_urls: List[str], timeout: float,
+             poll_interval: float = ENRICHMENT_POLL_INTERVAL) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait until enriched data for the profiles arrives, or the deadline passes.
+
+        With timeout 0 this only checks which profiles have already arrived.
+
+        Args:
+            profile_urls: LinkedIn profile URLs awaiting enrichment
+            timeout: Maximum seconds to wait
+            poll_interval: Seconds between profile store checks
+
+        Returns:
+            Enriched profile data keyed by normalized profile id, for the
+            profiles that arrived in time
+        """
+        profile_ids = {normalize_profile_id(url) for url in profile_urls}
+        if not profile_ids:
+            return {}
+        futures = self._acquire(profile_ids)
+        completed: Dict[str, Dict[str, Any]] = {}
+        deadline = time.monotonic() + max(0.0, timeout)
+        try:
+            while True:
+                self._collect(futures, completed)
+                remaining = deadline - time.monotonic()
+                if len(completed) == len(futures) or remaining <= 0:
+                    break
+                outstanding = [future for profile_id, future in futures.items() if profile_id not in completed]
+                wait(outstanding, timeout=min(poll_interval, remaining), return_when=FIRST_COMPLETED)
+        finally:
+            self._release(futures)
+        logger.info(f"Received {len(completed)} of {len(futures)} pending LinkedIn enrichments")
+        return completed
+
+    async def await_profiles(self, profile_urls: List[str], timeout: float,
+                             poll_interval: float = ENRICHMENT_POLL_INTERVAL) -> Dict[str, Dict[str, Any]]:
+        """
+        Async version of wait; other tasks on the event loop keep running.
+
+        Args:
+            profile_urls: LinkedIn profile URLs awaiting enrichment
+            timeout: Maximum seconds to wait
+            poll_interval: Seconds between profile store checks
+
+        Returns:
+            Enriched profile data keyed by normalized profile id, for the
+            profiles that arrived in time
+        """
+        profile_ids = {normalize_profile_id(url) for url in profile_urls}
+        if not profile_ids:
+            return {}
+        futures = self._acquire(profile_ids)
+        # Wrapped once; the wrappers are never cancelled, as that would cancel
+        # the shared futures other runs are waiting on
+        wrapped = {profile_id: asyncio.wrap_future(future) for profile_id, future in futures.items()}
+        completed: Dict[str, Dict[str, Any]] = {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, timeout)
+        try:
+            while True:
+                # Store lookups run in a worker thread to keep SQLite I/O off the event loop
+                await asyncio.to_thread(self._collect, futures, completed)
+                remaining = deadline - loop.time()
+                if len(completed) == len(futures) or remaining <= 0:
+                    break
+                outstanding = [wrapped[profile_id] for profile_id in futures if profile_id not in completed]
+                await asyncio.wait(outstanding, timeout=min(poll_interval, remaining), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._release(futures)
+        logger.info(f"Received {len(completed)} of {len(futures)} pending LinkedIn enrichments")
+        return completed
+
+enrichment = EnrichmentWaiters()
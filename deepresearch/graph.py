@@ -1,26 +1,41 @@
 import json
 import os
+import asyncio
+import re
+import threading
 from typing_extensions import Literal
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_openai import ChatOpenAI
 from langgraph.graph import START, END, StateGraph
 from langgraph.graph.message import add_messages
-from langsmith import Client
 
+from deepresearch.blob_store import get_blob_store, json_digest
 from deepresearch.configuration import Configuration
+from deepresearch.context_budget import PromptSection, context_window, fit_sections, messages_tokens, truncate_to_tokens
+from deepresearch.enrichment import enrichment
+from deepresearch.leads import dedupe_profiles, format_leads, merge_leads, parse_leads
+from deepresearch.llm import cached_response, get_chat_model
+from deepresearch.metrics import instrument, llm_usage, record_llm_usage
+from deepresearch.profile_store import normalize_profile_id
+from deepresearch.rate_limit import athrottle, charge, get_limiter, throttle
+from deepresearch.relevance import rank_results
 from deepresearch.utils import (
-    tavily_search, 
+    multi_search,
+    amulti_search,
+    normalize_query,
     format_sources, 
     deduplicate_and_format_sources, 
-    extract_linkedin_urls,
-    get_linkedin_profile_data
+    extract_result_linkedin_urls,
+    get_linkedin_profiles_data,
+    aget_linkedin_profiles_data
 )
 from deepresearch.state import SummaryState, SummaryStateInput, SummaryStateOutput
 from deepresearch.prompts import (
     query_writer_instructions, 
     summarizer_instructions, 
+    lead_extraction_instructions,
     reflection_instructions, 
     get_current_date
 )
@@ -32,6 +47,7 @@ if os.getenv("LANGSMITH_API_KEY") and os.getenv("LANGSMITH_PROJECT"):
         os.environ["LANGCHAIN_ENDPOINT"] = os.getenv("LANGSMITH_ENDPOINT")
     
     # Initialize LangSmith client
+    from langsmith import Client
     langsmith_client = Client(
         api_key=os.getenv("LANGSMITH_API_KEY"),
         api_url=os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com")
@@ -41,267 +57,552 @@ if os.getenv("LANGSMITH_API_KEY") and os.getenv("LANGSMITH_PROJECT"):
     if os.getenv("LANGSMITH_PROJECT"):
         os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGSMITH_PROJECT")
 
-# Nodes
-def generate_query(state, config: RunnableConfig):
-    """LangGraph node that generates a search query based on the lead criteria.
+# Helpers shared by the sync and async versions of each node
+def _chat_model(configurable: Configuration, json_mode: bool = False, cacheable: bool = False,
+                store_only: bool = False) -> ChatOpenAI:
+    """Get the shared chat model for a node, optionally in JSON response mode.
     
-    Uses OpenAI to create an optimized search query for finding leads based on
-    the user's specified criteria.
+    Cacheable calls go through the local LLM response cache when llm_cache is enabled;
+    with store_only the response is stored but the cache is not looked up.
+    """
+    cache = None
+    if cacheable and configurable.llm_cache:
+        cache = "refresh" if configurable.llm_cache_bypass or store_only else "read_write"
+    return get_chat_model(
+        configurable.llm_model,
+        api_key=configurable.openai_api_key,
+        response_format={"type": "json_object"} if json_mode else None,
+        cache=cache
+    )
+
+def _prompt_tokens(configurable: Configuration, messages) -> int:
+    """Estimated prompt tokens of a call, counted only when OpenAI tokens are rate limited."""
+    if get_limiter("openai_tokens") is None:
+        return 0
+    return messages_tokens([message.content for message in messages], configurable.llm_model)
+
+def _record_llm_result(result) -> None:
+    """Record an LLM response's token usage and charge its completion to the token quota."""
+    record_llm_usage(result)
+    charge("openai_tokens", llm_usage(result)[1])
+
+def _cached_llm_response(configurable: Configuration, messages, json_mode: bool, cacheable: bool):
+    """The LLM response cache's answer to a call, or None if the call has to reach OpenAI."""
+    if not cacheable:
+        return None
+    return cached_response(_chat_model(configurable, json_mode=json_mode, cacheable=True), messages)
+
+def _invoke_llm(configurable: Configuration, messages, json_mode: bool = False, cacheable: bool = False):
+    """Call the chat model once the OpenAI request and token quotas allow it.
     
-    Args:
-        state: Current graph state containing the lead criteria
-        config: Configuration for the runnable, including model settings
-        
-    Returns:
-        Dictionary with state update, including search_query key containing the generated query
+    Prompt tokens are taken from the token quota up front and completion tokens are
+    charged once the response reports them, so concurrent runs stay under the limits.
+    Responses served from the LLM response cache neither wait for nor use any quota.
+    """
+    cached = _cached_llm_response(configurable, messages, json_mode, cacheable)
+    if cached is not None:
+        return cached
+    throttle("openai")
+    throttle("openai_tokens", _prompt_tokens(configurable, messages))
+    # The cache was already looked up above, so the client only stores the response
+    result = _chat_model(configurable, json_mode=json_mode, cacheable=cacheable, store_only=True).invoke(messages)
+    _record_llm_result(result)
+    return result
+
+async def _ainvoke_llm(configurable: Configuration, messages, json_mode: bool = False, cacheable: bool = False):
+    """Async version of _invoke_llm."""
+    cached = await asyncio.to_thread(_cached_llm_response, configurable, messages, json_mode, cacheable)
+    if cached is not None:
+        return cached
+    await athrottle("openai")
+    await athrottle("openai_tokens", _prompt_tokens(configurable, messages))
+    result = await _chat_model(configurable, json_mode=json_mode, cacheable=cacheable, store_only=True).ainvoke(messages)
+    _record_llm_result(result)
+    return result
+
+def _parse_search_queries(content: str, max_queries: int):
+    """Get the queries from a JSON-mode response as a search_queries/search_query state update.
+    
+    Accepts a "queries" list or a single "query", dropping case/whitespace duplicates,
+    and falls back to the raw content if the response cannot be parsed.
     """
+    try:
+        payload = json.loads(content)
+        queries = payload.get("queries") or [payload['query']]
+        if isinstance(queries, str):
+            queries = [queries]
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+        # If parsing fails or the key is not found, use the raw content
+        queries = [content]
+    
+    unique_queries = {}
+    for query in queries:
+        if isinstance(query, str) and query.strip():
+            unique_queries.setdefault(normalize_query(query), query.strip())
+    search_queries = list(unique_queries.values())[:max(1, max_queries)] or [content]
+    return {"search_query": search_queries[0], "search_queries": search_queries}
 
-    # Format the prompt
+def _query_writer_messages(state, number_of_queries: int):
+    """Build the messages for generate_query."""
     current_date = get_current_date()
     formatted_prompt = query_writer_instructions.format(
         current_date=current_date,
-        research_topic=state["research_topic"]
+        research_topic=state["research_topic"],
+        number_of_queries=number_of_queries
     )
+    return [SystemMessage(content=formatted_prompt),
+            HumanMessage(content=f"Generate {number_of_queries} queries to find leads matching these criteria:")]
 
-    # Generate a query
-    configurable = Configuration.from_runnable_config(config)
-    
-    llm_json_mode = ChatOpenAI(
-        model=configurable.llm_model,
-        api_key=configurable.openai_api_key,
-        response_format={"type": "json_object"}
-    )
-    
-    result = llm_json_mode.invoke(
-        [SystemMessage(content=formatted_prompt),
-        HumanMessage(content=f"Generate a query to find leads matching these criteria:")]
-    )
-    
-    # Get the content
-    content = result.content
+def _web_research_queries(state):
+    """Get the search queries for web_research, with a fallback built from the criteria."""
+    search_queries = state.get("search_queries") or [state.get("search_query", "")]
+    search_queries = [query for query in search_queries if query]
+    if not search_queries:
+        search_queries = [f"leads for {state.get('research_topic', 'sales leads')}"]
+    return search_queries
 
-    # Parse the JSON response and get the query
-    try:
-        query = json.loads(content)
-        search_query = query['query']
-    except (json.JSONDecodeError, KeyError):
-        # If parsing fails or the key is not found, use a fallback query
-        search_query = content
-    return {"search_query": search_query}
+def _state_profiles(state):
+    """LinkedIn profiles referenced from state, one per profile id in first-seen order."""
+    digests = list(state.get("profile_digests", {}).values())
+    profiles = get_blob_store().get_json_many(digests)
+    return [profiles[digest] for digest in digests if digest in profiles]
 
-def web_research(state, config: RunnableConfig):
-    """LangGraph node that searches for leads using the generated search query.
+def _latest_research(state, default):
+    """The latest loop's formatted search results, or default before the first loop."""
+    digest = state.get("web_research_digest")
+    return get_blob_store().get_text(digest, default) if digest else default
+
+def _state_leads(state):
+    """Leads collected so far by incremental summarization."""
+    digest = state.get("leads_digest")
+    return get_blob_store().get_json(digest, []) if digest else []
+
+def _running_summary(state, default):
+    """The current lead summary, or default before the first summarization."""
+    if state.get("leads_digest"):
+        return format_leads(_state_leads(state))
+    digest = state.get("summary_digest")
+    return get_blob_store().get_text(digest, default) if digest else default
+
+def _collect_linkedin_urls(state, search_results):
+    """Extract LinkedIn profile URLs from search results that are not already in state."""
+    known_ids = state.get("profile_digests", {})
+    linkedin_urls = {}
+    for result in search_results:
+        # Extract LinkedIn URLs from the result URL, title and content in one pass
+        for url in extract_result_linkedin_urls(result):
+            # Deduplicate by profile id, so URL variants of one profile are requested once
+            profile_id = normalize_profile_id(url)
+            if profile_id not in known_ids:
+                linkedin_urls.setdefault(profile_id, url)
+    
+    return list(linkedin_urls.values())
+
+def _pending_profile_urls(state, new_linkedin_profiles):
+    """URLs of profiles, from earlier loops or this one, still awaiting Clay enrichment."""
+    profiles = _state_profiles(state) + list(new_linkedin_profiles)
+    return [profile.get("url", "") for profile in profiles if profile.get("status") == "pending"]
+
+def _web_research_update(state, search_results, new_linkedin_profiles, configurable: Configuration):
+    """Build the web_research state update from search results and profiles.
     
-    Executes a web search using Tavily and formats the results for further processing.
-    Also extracts and processes any LinkedIn profile URLs found in the results.
+    Search results, profiles and newly seen URLs are written to the blob store
+    and the update carries only their digests, for the profiles and URLs that
+    are new or changed, so its size does not grow with the number of loops.
+    """
+    store = get_blob_store()
+    # Only results likely to contain leads are sent on to the summarizer
+    prompt_results = search_results
+    if configurable.relevance_filter:
+        prompt_results = rank_results(
+            search_results, state.get("research_topic", ""), min_score=configurable.min_relevance_score,
+            max_results=configurable.max_ranked_sources
+        )
+    search_str = deduplicate_and_format_sources(prompt_results, max_tokens_per_source=1000, model=configurable.llm_model)
+    if not search_str:
+        search_str = "No relevant search results found."
+    
+    # Store profiles not yet in state, and completed data for pending ones; the only
+    # known profiles passed in are enrichments that arrived for pending profiles
+    known_profiles = state.get("profile_digests", {})
+    profile_digests = {}
+    for profile in dedupe_profiles(new_linkedin_profiles):
+        profile_id = normalize_profile_id(profile.get("url", ""))
+        if profile_id in known_profiles and profile.get("status") == "pending":
+            continue
+        profile_digests[profile_id] = store.put_json(profile)
+    
+    # Track how many URLs and profiles this loop found that earlier loops had not;
+    # each loop stores only its own new URLs
+    known_urls = set()
+    for urls in store.get_json_many(state.get("seen_url_digests", [])).values():
+        known_urls.update(urls)
+    new_urls = list(dict.fromkeys(
+        result.get("url", "") for result in search_results if result.get("url") and result.get("url") not in known_urls
+    ))
+    loop_yields = list(state.get("loop_yields", []))
+    loop_yields.append({
+        "new_urls": len(new_urls),
+        "new_profiles": len(profile_digests.keys() - known_profiles.keys()),
+        "new_leads": 0
+    })
     
-    Args:
-        state: Current graph state containing the search query and research loop count
-        config: Configuration for the runnable, including search API settings
+    return {
+        "source_digests": [store.put_text(format_sources(search_results))],
+        "research_loop_count": state.get("research_loop_count", 0) + 1, 
+        "web_research_digest": store.put_text(search_str),
+        "profile_digests": profile_digests,
+        "seen_url_digests": [store.put_json(new_urls)],
+        "loop_yields": loop_yields
+    }
+
+def _profile_lines(linkedin_profiles):
+    """Format each LinkedIn profile as a single prompt line."""
+    lines = []
+    for profile in linkedin_profiles:
+        url = profile.get("url", "No URL")
+        name = profile.get("name", "Unknown")
+        title = profile.get("title", "No title")
+        company = profile.get("company", "No company")
+        status = profile.get("status", "complete")
         
-    Returns:
-        Dictionary with state update, including sources_gathered, research_loop_count,
-        web_research_results, and linkedin_profiles
-    """
+        line = f"- {name}: {title} at {company} | {url}"
+        if status == "pending":
+            line += " (Profile data requested from Clay; not received yet)"
+        lines.append(line)
+    return lines
 
-    # Configure
-    configurable = Configuration.from_runnable_config(config)
-    
-    # Ensure we have a search query
-    search_query = state.get("search_query", "")
-    if not search_query:
-        search_query = f"leads for {state.get('research_topic', 'sales leads')}"
-    
-    # Get current research loop count with default
-    research_loop_count = state.get("research_loop_count", 0)
-    
-    # Get current LinkedIn profiles with default
-    linkedin_profiles = state.get("linkedin_profiles", [])
+def _linkedin_section(profile_lines):
+    """Wrap profile lines as a prompt section, or an empty string if there are none."""
+    if not profile_lines:
+        return ""
+    return "\n\n<LinkedIn Profiles>\n" + "\n".join(profile_lines) + "\n</LinkedIn Profiles>"
+
+def _split_sources(search_str):
+    """Split formatted search results back into one item per source."""
+    return [source for source in re.split(r"\n\n(?=SOURCE \d+:)", search_str) if source]
 
-    # Search the web
-    search_results = tavily_search(search_query, max_results=5)
-    search_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000)
+def _prompt_budget(configurable: Configuration, *fixed_texts) -> int:
+    """Tokens left for variable prompt sections after fixed text and the completion reserve."""
+    return (context_window(configurable.llm_model) - configurable.completion_token_reserve
+            - messages_tokens(fixed_texts, configurable.llm_model))
+
+def _profile_key(profile) -> str:
+    """Identity of a profile version, its blob digest; a pending profile that completes gets a new key."""
+    return json_digest(profile)
+
+def _unsummarized_profiles(state):
+    """LinkedIn profiles that have not yet been sent to the summarizer."""
+    summarized = set(state.get("summarized_profiles", []))
+    digests = [digest for digest in dict.fromkeys(state.get("profile_digests", {}).values()) if digest not in summarized]
+    profiles = get_blob_store().get_json_many(digests)
+    return [profiles[digest] for digest in digests if digest in profiles]
+
+def _lead_extraction_messages(state, new_profiles, configurable: Configuration):
+    """Build the messages for incremental summarization.
     
-    # Process LinkedIn URLs from the search results
-    linkedin_urls = []
-    for result in search_results:
-        # Extract LinkedIn URLs from result content and URL
-        content_urls = extract_linkedin_urls(result.get("content", ""))
-        title_urls = extract_linkedin_urls(result.get("title", ""))
-        linkedin_urls.extend(content_urls + title_urls)
+    Only the latest search results and newly seen profiles are included, so the
+    prompt size does not grow with the number of loops or leads collected. Sources
+    and profiles are fitted to the model's context window by priority.
     
-    # Deduplicate LinkedIn URLs
-    linkedin_urls = list(set(linkedin_urls))
+    Returns:
+        Tuple of the messages and the profiles that were included
+    """
+    research_topic = state.get("research_topic", "sales leads")
+    most_recent_web_research = _latest_research(state, "No web research results available yet.")
     
-    # Process LinkedIn profiles if any found
-    new_linkedin_profiles = []
-    for url in linkedin_urls:
-        profile_data = get_linkedin_profile_data(url)
-        new_linkedin_profiles.append(profile_data)
+    def render(sources, profile_lines):
+        return (
+            f"<Lead Criteria> \n {research_topic} \n </Lead Criteria>\n\n"
+            f"<New Search Results> \n {sources} \n </New Search Results>"
+        ) + _linkedin_section(profile_lines)
+    
+    # Sources come first; profiles get what is left of their share and any slack
+    budget = _prompt_budget(configurable, lead_extraction_instructions, render("", [""]))
+    fitted = fit_sections([
+        PromptSection("sources", _split_sources(most_recent_web_research), priority=0, share=0.6),
+        PromptSection("profiles", _profile_lines(new_profiles), priority=1, share=0.4, separator="\n")
+    ], budget, configurable.llm_model)
+    human_message_content = render("\n\n".join(fitted["sources"]), fitted["profiles"])
+    
+    return ([SystemMessage(content=lead_extraction_instructions),
+             HumanMessage(content=human_message_content)],
+            new_profiles[:len(fitted["profiles"])])
+
+def _merge_extracted_leads(state, content, new_profiles):
+    """Merge leads extracted by the LLM into the leads collected so far, kept in the blob store."""
+    leads, new_lead_count = merge_leads(_state_leads(state), parse_leads(content))
+    # Appended to the summarized profiles by the state reducer
+    summarized_profiles = [_profile_key(profile) for profile in new_profiles]
     
-    # Update LinkedIn profiles list
-    linkedin_profiles.extend(new_linkedin_profiles)
+    # Record the leads this loop added for convergence-aware routing
+    loop_yields = [dict(loop_yield) for loop_yield in state.get("loop_yields", [])]
+    if loop_yields:
+        loop_yields[-1]["new_leads"] = new_lead_count
     
     return {
-        "sources_gathered": [format_sources(search_results)], 
-        "research_loop_count": research_loop_count + 1, 
-        "web_research_results": [search_str],
-        "linkedin_profiles": linkedin_profiles
+        "leads_digest": get_blob_store().put_json(leads),
+        "summarized_profiles": summarized_profiles,
+        "loop_yields": loop_yields
     }
 
-def summarize_leads(state, config: RunnableConfig):
-    """LangGraph node that processes and summarizes lead information.
-    
-    Uses an LLM to compile lead information from web research results and LinkedIn profiles,
-    organizing it into a structured list of leads.
+def _summarizer_messages(state, configurable: Configuration):
+    """Build the messages for summarize_leads.
     
-    Args:
-        state: Current graph state containing lead criteria, web research results, and LinkedIn profiles
-        config: Configuration for the runnable, including LLM provider settings
-        
-    Returns:
-        Dictionary with state update, including running_summary key containing the structured leads
+    The existing summary, latest search results and LinkedIn profiles are fitted
+    to the model's context window by priority, in that order.
     """
-
     # Existing summary with default
-    existing_summary = state.get("running_summary", "")
+    existing_summary = _running_summary(state, "")
 
     # Get lead criteria with default
     research_topic = state.get("research_topic", "sales leads")
 
     # Most recent web research with default
-    web_research_results = state.get("web_research_results", [])
-    if not web_research_results:
-        web_research_results = ["No web research results available yet."]
-    most_recent_web_research = web_research_results[-1]
-    
-    # Get LinkedIn profiles with default
-    linkedin_profiles = state.get("linkedin_profiles", [])
+    most_recent_web_research = _latest_research(state, "No web research results available yet.")
     
     # Format LinkedIn profiles for inclusion in the summary
-    linkedin_info = ""
-    if linkedin_profiles:
-        linkedin_info = "\n\n<LinkedIn Profiles>\n"
-        for profile in linkedin_profiles:
-            url = profile.get("url", "No URL")
-            name = profile.get("name", "Unknown")
-            title = profile.get("title", "No title")
-            company = profile.get("company", "No company")
-            status = profile.get("status", "complete")
-            
-            linkedin_info += f"- {name}: {title} at {company} | {url}"
-            if status == "pending":
-                linkedin_info += " (Profile data requested and will be available in future runs)"
-            linkedin_info += "\n"
-        linkedin_info += "</LinkedIn Profiles>"
+    profile_lines = _profile_lines(_state_profiles(state))
 
     # Build the human message
-    if existing_summary:
-        human_message_content = (
-            f"<Lead Criteria> \n {research_topic} \n </Lead Criteria>\n\n"
-            f"<Existing Leads> \n {existing_summary} \n </Existing Leads>\n\n"
-            f"<New Search Results> \n {most_recent_web_research} \n </New Search Results>"
-        )
-        if linkedin_info:
-            human_message_content += f"\n\n{linkedin_info}"
-    else:
-        human_message_content = (
-            f"<Lead Criteria> \n {research_topic} \n </Lead Criteria>\n\n"
-            f"<Search Results> \n {most_recent_web_research} \n </Search Results>"
-        )
-        if linkedin_info:
-            human_message_content += f"\n\n{linkedin_info}"
+    def render(summary, sources, lines):
+        if existing_summary:
+            content = (
+                f"<Lead Criteria> \n {research_topic} \n </Lead Criteria>\n\n"
+                f"<Existing Leads> \n {summary} \n </Existing Leads>\n\n"
+                f"<New Search Results> \n {sources} \n </New Search Results>"
+            )
+        else:
+            content = (
+                f"<Lead Criteria> \n {research_topic} \n </Lead Criteria>\n\n"
+                f"<Search Results> \n {sources} \n </Search Results>"
+            )
+        return content + _linkedin_section(lines)
+
+    budget = _prompt_budget(configurable, summarizer_instructions, render("", "", [""]))
+    fitted = fit_sections([
+        PromptSection("summary", [existing_summary] if existing_summary else [], priority=0, share=0.3),
+        PromptSection("sources", _split_sources(most_recent_web_research), priority=1, share=0.5),
+        PromptSection("profiles", profile_lines, priority=2, share=0.2, separator="\n")
+    ], budget, configurable.llm_model)
+    human_message_content = render("".join(fitted["summary"]), "\n\n".join(fitted["sources"]), fitted["profiles"])
+
+    return [SystemMessage(content=summarizer_instructions),
+            HumanMessage(content=human_message_content)]
+
+def _reflection_messages(state, configurable: Configuration):
+    """Build the messages for reflect_on_leads."""
+    # Get state values with defaults
+    research_topic = state.get("research_topic", "sales leads")
+    running_summary = _running_summary(state, "No leads available yet.")
+    number_of_queries = configurable.queries_per_loop
+
+    system_content = reflection_instructions.format(research_topic=research_topic, number_of_queries=number_of_queries)
+    def render(summary):
+        return f"Reflect on our existing leads: \n === \n {summary}, \n === \n And now identify missing lead types and generate {number_of_queries} follow-up search queries:"
+
+    # Keep the leads list within the context window once it outgrows it
+    budget = _prompt_budget(configurable, system_content, render(""))
+    running_summary = truncate_to_tokens(running_summary, max(0, budget), configurable.llm_model)
+
+    return [SystemMessage(content=system_content),
+            HumanMessage(content=render(running_summary))]
+
+# Nodes
+def generate_query(state, config: RunnableConfig):
+    """LangGraph node that generates search queries based on the lead criteria.
+    
+    Uses OpenAI to create queries_per_loop diverse, optimized search queries for
+    finding leads based on the user's specified criteria.
+    
+    Args:
+        state: Current graph state containing the lead criteria
+        config: Configuration for the runnable, including model settings
+        
+    Returns:
+        Dictionary with state update, including search_queries key containing the generated queries
+        and search_query key containing the first of them
+    """
+    configurable = Configuration.from_runnable_config(config)
+    messages = _query_writer_messages(state, configurable.queries_per_loop)
+    result = _invoke_llm(configurable, messages, json_mode=True, cacheable=True)
+    return _parse_search_queries(result.content, configurable.queries_per_loop)
 
-    # Run the LLM
+async def agenerate_query(state, config: RunnableConfig):
+    """Async version of generate_query."""
     configurable = Configuration.from_runnable_config(config)
+    messages = _query_writer_messages(state, configurable.queries_per_loop)
+    result = await _ainvoke_llm(configurable, messages, json_mode=True, cacheable=True)
+    return _parse_search_queries(result.content, configurable.queries_per_loop)
+
+def web_research(state, config: RunnableConfig):
+    """LangGraph node that searches for leads using the generated search queries.
+    
+    Executes one Tavily search per query concurrently, merges the results with URL
+    deduplication and formats them for further processing.
+    Also extracts and processes any LinkedIn profile URLs found in the results, and
+    swaps in Clay enrichments that arrived for pending profiles, waiting up to
+    enrichment_wait_seconds for outstanding ones.
     
-    llm = ChatOpenAI(
-        model=configurable.llm_model,
-        api_key=configurable.openai_api_key
+    Args:
+        state: Current graph state containing the search queries and research loop count
+        config: Configuration for the runnable, including search API settings
+        
+    Returns:
+        Dictionary with state update, including research_loop_count and the digests of this
+        loop's sources, search results and new or completed LinkedIn profiles
+    """
+    configurable = Configuration.from_runnable_config(config)
+
+    # Search the web, running all queries for this loop concurrently
+    search_results = multi_search(
+        _web_research_queries(state), max_results=configurable.max_results_per_query,
+        max_workers=configurable.queries_per_loop
     )
     
-    result = llm.invoke(
-        [SystemMessage(content=summarizer_instructions),
-        HumanMessage(content=human_message_content)]
+    # Process LinkedIn profiles if any found, fanning out Clay requests concurrently
+    new_linkedin_profiles = get_linkedin_profiles_data(
+        _collect_linkedin_urls(state, search_results), max_workers=configurable.max_concurrent_enrichments
     )
+    
+    # Pick up enrichments that arrived, waiting up to the deadline for the rest;
+    # completed profiles replace their pending placeholders in the update
+    completed = enrichment.wait(_pending_profile_urls(state, new_linkedin_profiles), configurable.enrichment_wait_seconds)
+    new_linkedin_profiles = list(new_linkedin_profiles) + list(completed.values())
+    
+    return _web_research_update(state, search_results, new_linkedin_profiles, configurable)
 
-    running_summary = result.content
+async def aweb_research(state, config: RunnableConfig):
+    """Async version of web_research."""
+    configurable = Configuration.from_runnable_config(config)
+    search_results = await amulti_search(_web_research_queries(state), max_results=configurable.max_results_per_query)
+    new_linkedin_profiles = await aget_linkedin_profiles_data(
+        _collect_linkedin_urls(state, search_results), max_concurrency=configurable.max_concurrent_enrichments
+    )
+    # Blob store reads and writes run in a worker thread to keep the event loop free
+    pending_urls = await asyncio.to_thread(_pending_profile_urls, state, new_linkedin_profiles)
+    completed = await enrichment.await_profiles(pending_urls, configurable.enrichment_wait_seconds)
+    new_linkedin_profiles = list(new_linkedin_profiles) + list(completed.values())
+    return await asyncio.to_thread(_web_research_update, state, search_results, new_linkedin_profiles, configurable)
 
-    return {"running_summary": running_summary}
+def summarize_leads(state, config: RunnableConfig):
+    """LangGraph node that processes and summarizes lead information.
+    
+    Uses an LLM to compile lead information from web research results and LinkedIn profiles,
+    organizing it into a structured list of leads. In incremental mode (the default) only the
+    latest results and newly seen profiles are sent, and the extracted leads are merged into
+    the leads already collected.
+    
+    Args:
+        state: Current graph state containing lead criteria, web research results, and LinkedIn profiles
+        config: Configuration for the runnable, including LLM provider settings
+        
+    Returns:
+        Dictionary with state update, including the digest of the leads collected so far
+        (leads_digest) or of the rewritten summary (summary_digest)
+    """
+    configurable = Configuration.from_runnable_config(config)
+    if configurable.incremental_summary:
+        messages, new_profiles = _lead_extraction_messages(state, _unsummarized_profiles(state), configurable)
+        result = _invoke_llm(configurable, messages, json_mode=True)
+        return _merge_extracted_leads(state, result.content, new_profiles)
+    
+    result = _invoke_llm(configurable, _summarizer_messages(state, configurable))
+    return {"summary_digest": get_blob_store().put_text(result.content)}
+
+async def asummarize_leads(state, config: RunnableConfig):
+    """Async version of summarize_leads."""
+    configurable = Configuration.from_runnable_config(config)
+    if configurable.incremental_summary:
+        messages, new_profiles = await asyncio.to_thread(
+            lambda: _lead_extraction_messages(state, _unsummarized_profiles(state), configurable)
+        )
+        result = await _ainvoke_llm(configurable, messages, json_mode=True)
+        return await asyncio.to_thread(_merge_extracted_leads, state, result.content, new_profiles)
+    
+    result = await _ainvoke_llm(configurable, await asyncio.to_thread(_summarizer_messages, state, configurable))
+    return {"summary_digest": await asyncio.to_thread(get_blob_store().put_text, result.content)}
 
 def reflect_on_leads(state, config: RunnableConfig):
     """LangGraph node that identifies gaps in the current lead collection.
     
     Analyzes the current leads to identify missing types of leads or areas for
-    further lead search. Uses structured output to extract the follow-up query in JSON format.
+    further lead search. Uses structured output to extract the follow-up queries in JSON format.
     
     Args:
         state: Current graph state containing the running summary and lead criteria
         config: Configuration for the runnable, including LLM provider settings
         
     Returns:
-        Dictionary with state update, including search_query key containing the generated follow-up query
+        Dictionary with state update, including search_queries key containing the generated follow-up
+        queries and search_query key containing the first of them
     """
+    configurable = Configuration.from_runnable_config(config)
+    messages = _reflection_messages(state, configurable)
+    result = _invoke_llm(configurable, messages, json_mode=True, cacheable=True)
+    return _parse_search_queries(result.content, configurable.queries_per_loop)
 
-    # Get state values with defaults
-    research_topic = state.get("research_topic", "sales leads")
-    running_summary = state.get("running_summary", "No leads available yet.")
-
-    # Generate a query
+async def areflect_on_leads(state, config: RunnableConfig):
+    """Async version of reflect_on_leads."""
     configurable = Configuration.from_runnable_config(config)
+    messages = await asyncio.to_thread(_reflection_messages, state, configurable)
+    result = await _ainvoke_llm(configurable, messages, json_mode=True, cacheable=True)
+    return _parse_search_queries(result.content, configurable.queries_per_loop)
+
+def _stop_reason(state, configurable: Configuration):
+    """Reason to stop researching, or None if another loop should run.
     
-    llm_json_mode = ChatOpenAI(
-        model=configurable.llm_model,
-        api_key=configurable.openai_api_key,
-        response_format={"type": "json_object"}
-    )
-    
-    result = llm_json_mode.invoke(
-        [SystemMessage(content=reflection_instructions.format(research_topic=research_topic)),
-        HumanMessage(content=f"Reflect on our existing leads: \n === \n {running_summary}, \n === \n And now identify missing lead types and generate a follow-up search query:")]
-    )
-    
-    # Get the content
-    content = result.content
-    
-    # Parse the JSON response and get the query
-    try:
-        query = json.loads(content)
-        search_query = query['query']
-    except (json.JSONDecodeError, KeyError):
-        # If parsing fails or the key is not found, use the raw content
-        search_query = content
-    
-    return {"search_query": search_query}
+    Stops once the loop budget is spent, or once the last convergence_patience loops
+    each found fewer than min_marginal_yield new URLs, profiles and leads combined.
+    """
+    research_loop_count = state.get("research_loop_count", 0)
+    if research_loop_count > configurable.max_web_research_loops:
+        return f"max_loops_reached: completed {research_loop_count} research loops"
+    
+    patience = configurable.convergence_patience
+    loop_yields = state.get("loop_yields", [])
+    if patience > 0 and len(loop_yields) >= patience:
+        recent_yields = [sum(loop_yield.values()) for loop_yield in loop_yields[-patience:]]
+        if all(total < configurable.min_marginal_yield for total in recent_yields):
+            return (f"converged: last {patience} loops found {recent_yields} new URLs, profiles "
+                    f"and leads (threshold {configurable.min_marginal_yield})")
+    return None
 
-def finalize_leads(state):
+def finalize_leads(state, config: RunnableConfig):
     """LangGraph node that finalizes the lead collection.
     
     Prepares the final output by formatting the running summary with LinkedIn profiles
     and other sources to create a comprehensive lead list.
     
     Args:
-        state: Current graph state containing the running summary, sources gathered, and linkedin_profiles
+        state: Current graph state containing the running summary and the digests of the sources
+            gathered and LinkedIn profiles
+        config: Configuration for the runnable, used to record why research stopped
         
     Returns:
-        Dictionary with state update, including running_summary key containing the formatted final leads
+        Dictionary with state update, including running_summary key containing the formatted final leads,
+        leads key containing the lead records and stop_reason key explaining why research stopped
     """
 
     # Get values with defaults
-    running_summary = state.get("running_summary", "No leads available.")
-    sources_gathered = state.get("sources_gathered", [])
-    linkedin_profiles = state.get("linkedin_profiles", [])
+    running_summary = _running_summary(state, "No leads available.")
+    store = get_blob_store()
+    source_digests = state.get("source_digests", [])
+    stored_sources = store.get_many(source_digests)
+    sources_gathered = [stored_sources[digest].decode("utf-8") for digest in source_digests if digest in stored_sources]
+    linkedin_profiles = _state_profiles(state)
 
-    # Deduplicate sources before joining
+    # Deduplicate sources by URL before joining
     seen_sources = set()
     unique_sources = []
     
     for source in sources_gathered:
         # Split the source into lines and process each individually
         for line in source.split('\n'):
-            # Only process non-empty lines
-            if line.strip() and line not in seen_sources:
-                seen_sources.add(line)
+            # Lines are formatted as "N. title - url", so the URL identifies the source
+            source_key = line.rsplit(" - ", 1)[-1].strip()
+            if source_key and source_key not in seen_sources:
+                seen_sources.add(source_key)
                 unique_sources.append(line)
     
     # Create LinkedIn profiles section if profiles were found
@@ -323,47 +624,82 @@ def finalize_leads(state):
     
     if linkedin_section:
         final_summary += linkedin_section
+    
+    stop_reason = _stop_reason(state, Configuration.from_runnable_config(config)) or "completed"
         
-    return {"running_summary": final_summary}
+    return {"running_summary": final_summary, "leads": _state_leads(state), "stop_reason": stop_reason}
 
-def route_research(state, config: RunnableConfig) -> Literal["finalize_leads", "web_research"]:
+def route_research(state, config: RunnableConfig) -> Literal["finalize_leads", "reflect_on_leads"]:
     """LangGraph routing function that determines the next step in the lead generation flow.
     
     Controls the lead search loop by deciding whether to continue gathering information
-    or to finalize the lead list based on the configured maximum number of research loops.
+    or to finalize the lead list. Research stops when the configured maximum number of
+    research loops is exceeded, or earlier once recent loops stop finding new URLs,
+    profiles or leads. Routing happens before reflection, so no follow-up queries are
+    generated for a loop that will not run.
     
     Args:
-        state: Current graph state containing the research loop count
-        config: Configuration for the runnable, including max_web_research_loops setting
+        state: Current graph state containing the research loop count and per-loop yields
+        config: Configuration for the runnable, including max_web_research_loops and
+            convergence settings
         
     Returns:
-        String literal indicating the next node to visit ("web_research" or "finalize_leads")
+        String literal indicating the next node to visit ("reflect_on_leads" or "finalize_leads")
     """
 
     configurable = Configuration.from_runnable_config(config)
-    research_loop_count = state.get("research_loop_count", 0)
-    if research_loop_count <= configurable.max_web_research_loops:
-        return "web_research"
+    if _stop_reason(state, configurable) is None:
+        return "reflect_on_leads"
     else:
         return "finalize_leads"
 
 # Add nodes and edges
 builder = StateGraph(SummaryState, input=SummaryStateInput, output=SummaryStateOutput, config_schema=Configuration)
-builder.add_node("generate_query", generate_query)
-builder.add_node("web_research", web_research)
-builder.add_node("summarize_leads", summarize_leads)
-builder.add_node("reflect_on_leads", reflect_on_leads)
-builder.add_node("finalize_leads", finalize_leads)
+def _node(name, func, afunc=None):
+    """Instrument a node and, if it has an async version, pair both in one runnable.
+    
+    Nodes carrying both implementations let the compiled graph support invoke/stream
+    as well as ainvoke/astream without blocking the event loop.
+    """
+    if afunc is None:
+        return instrument(name, node=True)(func)
+    return RunnableLambda(instrument(name, node=True)(func), afunc=instrument(name, node=True)(afunc), name=name)
+
+builder.add_node("generate_query", _node("generate_query", generate_query, agenerate_query))
+builder.add_node("web_research", _node("web_research", web_research, aweb_research))
+builder.add_node("summarize_leads", _node("summarize_leads", summarize_leads, asummarize_leads))
+builder.add_node("reflect_on_leads", _node("reflect_on_leads", reflect_on_leads, areflect_on_leads))
+builder.add_node("finalize_leads", _node("finalize_leads", finalize_leads))
 
 # Add edges
 builder.add_edge(START, "generate_query")
 builder.add_edge("generate_query", "web_research")
 builder.add_edge("web_research", "summarize_leads")
-builder.add_edge("summarize_leads", "reflect_on_leads")
-builder.add_conditional_edges("reflect_on_leads", route_research)
+builder.add_conditional_edges("summarize_leads", route_research)
+builder.add_edge("reflect_on_leads", "web_research")
 builder.add_edge("finalize_leads", END)
 
-graph = builder.compile()
+def compile_graph(checkpointer=None):
+    """Compile the lead generation graph, optionally checkpointing state after every node."""
+    return builder.compile(checkpointer=checkpointer)
+
+_graph = None
+_graph_lock = threading.Lock()
+
+def get_graph():
+    """Get the default graph (no checkpointer), compiling it on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = compile_graph()
+    return _graph
+
+def __getattr__(name):
+    # `graph` is compiled when first accessed rather than when the module is imported
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Add this to register the graph with a workspace
 if __name__ == "__main__":
@@ -371,7 +707,7 @@ if __name__ == "__main__":
         from langgraph.app import server
         
         # Register the graph with a name
-        server.add_graph("lead_generator", graph)
+        server.add_graph("lead_generator", get_graph())
         
         # Enable LangSmith tracing if environment variables are configured
         if os.getenv("LANGSMITH_API_KEY") and os.getenv("LANGSMITH_PROJECT"):
@@ -392,7 +728,7 @@ if __name__ == "__main__":
                 print("LangSmith tracing not configured. Set LANGSMITH_API_KEY and LANGSMITH_PROJECT to enable.")
             
             # Run the graph directly
-            run_graph(graph, "lead_generator", port=8123)
+            run_graph(get_graph(), "lead_generator", port=8123)
         except ImportError:
             print("Error: Could not find langgraph.app.server or langgraph.cli.run")
             print("Please check your langgraph version or try running: langgraph run")
\ No newline at end of file
@@ -0,0 +1,235 @@
+import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from deepresearch.rate_limit import athrottle, penalize, throttle
+
+# Defaults for the shared HTTP client layer, overridable via environment
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "20"))
+
+# Status codes that are safe to retry with backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Status codes meaning the provider refused the request without processing it,
+# so even non-idempotent requests (POSTs) are retried on them
+REJECTED_STATUS_CODES = (429, 503)
+
+# Connection errors raised before the request was sent
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+class ProviderRetry(Retry):
+    """
+    Retry policy that keeps retries within the provider's rate limit.
+
+    Idempotent requests are retried on every status in RETRY_STATUS_CODES;
+    other methods only on REJECTED_STATUS_CODES, since a POST that failed with
+    500 may already have been processed. Each retry waits for a slot in the
+    provider's quota like a first attempt, and a 429 holds back every caller
+    of the provider instead of only this request.
+    """
+
+    def __init__(self, *args, provider: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.provider = provider
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.provider = self.provider
+        return retry
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code in REJECTED_STATUS_CODES and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def sleep(self, response=None):
+        rate_limited = self.provider and response is not None and response.status == 429
+        # After a penalty the throttle below waits out the pause, so skip the backoff
+        if not (rate_limited and penalize(self.provider, self.get_retry_after(response) or self.get_backoff_time())):
+            super().sleep(response)
+        if self.provider:
+            throttle(self.provider)
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a default timeout applied to every request.
+
+    requests has no session-level timeout, so without this a stalled provider
+    would block the calling node indefinitely. Requests of a named provider
+    also wait for a slot in its rate limit, and a final 429 response holds
+    back every caller of that provider.
+    """
+
+    def __init__(self, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT), provider: Optional[str] = None):
+        super().__init__()
+        self.timeout = timeout
+        self.provider = provider
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        # Retries are throttled by ProviderRetry
+        if self.provider:
+            throttle(self.provider)
+        response = super().request(method, url, **kwargs)
+        if self.provider and response.status_code == 429:
+            penalize(self.provider, _retry_delay(HTTP_MAX_RETRIES, response.headers.get("Retry-After")))
+        return response
+
+def create_session(
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR,
+    pool_size: int = HTTP_POOL_SIZE,
+    timeout: Optional[float] = None,
+    provider: Optional[str] = None
+) -> PooledSession:
+    """
+    Create a keep-alive session with connection pooling and retry/backoff.
+
+    Args:
+        max_retries: Maximum retries on connection errors and 429/5xx responses
+            (only on 429/503 and unsent requests for non-idempotent methods)
+        backoff_factor: Exponential backoff factor between retries
+        pool_size: Maximum pooled connections per host
+        timeout: Read timeout in seconds (defaults to HTTP_TIMEOUT)
+        provider: Provider whose rate limit requests are subject to, if any
+
+    Returns:
+        Configured session
+    """
+    retry = ProviderRetry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        provider=provider
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = PooledSession(timeout=(HTTP_CONNECT_TIMEOUT, timeout or HTTP_TIMEOUT), provider=provider)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_sessions: Dict[str, PooledSession] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(provider: str) -> PooledSession:
+    """
+    Get the shared session for a provider, creating it on first use.
+
+    Each provider gets its own connection pool so a slow provider cannot
+    starve connections for the others, and its requests are rate limited
+    by the provider's quota.
+
+    Args:
+        provider: Provider name (e.g. "tavily", "clay")
+
+    Returns:
+        Long-lived session for the provider
+    """
+    session = _sessions.get(provider)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(provider)
+            if session is None:
+                session = create_session(provider=provider)
+                _sessions[provider] = session
+    return session
+
+def close_sessions() -> None:
+    """Close all shared sessions and their pooled connections."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before a retry, honouring a numeric Retry-After header."""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return HTTP_BACKOFF_FACTOR * (2 ** attempt)
+
+# Async clients are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """
+    Get the shared async client for a provider on the running event loop.
+
+    Args:
+        provider: Provider name (e.g. "tavily", "clay")
+
+    Returns:
+        Long-lived httpx.AsyncClient with keep-alive connection pooling
+    """
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(provider)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+        )
+        clients[provider] = client
+    return client
+
+async def arequest(provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send an async request with retry/backoff on connection errors and 429/5xx.
+
+    Non-idempotent methods follow the same rules as ProviderRetry: they are
+    only retried on 429/503 and on connection errors raised before the request
+    was sent. Every attempt waits for a slot in the provider's rate limit, and
+    a 429 response holds back every caller of the provider.
+
+    Args:
+        provider: Provider name selecting the shared client
+        method: HTTP method
+        url: Request URL
+        kwargs: Extra arguments passed to httpx.AsyncClient.request
+
+    Returns:
+        The final response, which may still carry a retryable status once
+        retries are exhausted
+    """
+    client = get_async_client(provider)
+    idempotent = method.upper() in Retry.DEFAULT_ALLOWED_METHODS
+    retry_statuses = RETRY_STATUS_CODES if idempotent else REJECTED_STATUS_CODES
+    retry_errors = httpx.TransportError if idempotent else NOT_SENT_ERRORS
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        retry_after = None
+        await athrottle(provider)
+        try:
+            response = await client.request(method, url, **kwargs)
+        except retry_errors:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if response.status_code not in retry_statuses or attempt == HTTP_MAX_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            if response.status_code == 429 and penalize(provider, _retry_delay(attempt, retry_after)):
+                # The next throttle waits out the pause
+                continue
+        await asyncio.sleep(_retry_delay(attempt, retry_after))
+
+async def aclose_async_clients() -> None:
+    """Close the shared async clients of the running event loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
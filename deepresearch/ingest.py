@@ -0,0 +1,186 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from deepresearch.enrichment import enrichment
+from deepresearch.profile_store import ProfileStore, get_profile_store, normalize_profile_id
+
+logger = logging.getLogger(__name__)
+
+# Callbacks held in memory before new ones are rejected (0 writes each callback synchronously)
+INGEST_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", "10000"))
+
+# Most profiles written to the store in one transaction
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "500"))
+
+# Longest time a received profile waits before it is flushed, in seconds
+INGEST_FLUSH_INTERVAL = float(os.environ.get("INGEST_FLUSH_INTERVAL", "0.2"))
+
+# Seconds a rejected sender is asked to wait before retrying
+INGEST_RETRY_AFTER = int(os.environ.get("INGEST_RETRY_AFTER", "2"))
+
+# Attempts to write a batch before it is dropped
+INGEST_WRITE_ATTEMPTS = 3
+
+class IngestQueue:
+    """
+    Bounded in-memory queue that writes received profiles to the store in batches.
+
+    Callers only enqueue, so webhook requests are acknowledged without waiting
+    on the database. A background thread collects up to batch_size profiles, or
+    whatever arrived within flush_interval, and writes them with one put_many
+    transaction. When the queue is full, submit returns False so the caller can
+    push back on the sender.
+
+    The flusher thread starts on first use, so a queue created before a server
+    forks its workers starts a thread in each worker rather than in the parent.
+    """
+
+    def __init__(self, store_factory: Callable[[], ProfileStore] = get_profile_store,
+                 max_size: int = INGEST_QUEUE_SIZE, batch_size: int = INGEST_BATCH_SIZE,
+                 flush_interval: float = INGEST_FLUSH_INTERVAL):
+        self._store_factory = store_factory
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._stats = {"accepted": 0, "rejected": 0, "flushed": 0, "batches": 0, "dropped": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.close)
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="profile-ingest", daemon=True)
+                self._thread.start()
+
+    def submit(self, profile_data: Dict[str, Any]) -> bool:
+        """
+        Queue a profile for writing without blocking.
+
+        Args:
+            profile_data: Profile data received from Clay
+
+        Returns:
+            True if the profile was queued, False if the queue is full
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(profile_data)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            return False
+        with self._lock:
+            self._stats["accepted"] += 1
+        return True
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for the first profile, then take what arrives within flush_interval."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(1, INGEST_WRITE_ATTEMPTS + 1):
+            try:
+                self._store_factory().put_many(batch)
+                enrichment.resolve(batch)
+                with self._lock:
+                    self._stats["flushed"] += len(batch)
+                    self._stats["batches"] += 1
+                logger.info(f"Saved {len(batch)} LinkedIn profiles from webhook callbacks")
+                return
+            except Exception as e:
+                logger.error(f"Error saving {len(batch)} LinkedIn profiles (attempt {attempt}): {str(e)}")
+                time.sleep(0.1 * attempt)
+        with self._lock:
+            self._stats["dropped"] += len(batch)
+        self._drop(batch)
+
+    def _drop(self, batch: List[Dict[str, Any]]) -> None:
+        """Report profiles that could not be written and release their enrichment claims.
+
+        Clay was already answered 202, so without the claims released the profiles
+        could not be requested again until CLAY_PENDING_TTL expires.
+        """
+        urls = [profile.get("url") or "" for profile in batch]
+        profile_ids = [normalize_profile_id(url) if url else "unknown" for url in urls]
+        logger.error(f"Dropped {len(batch)} LinkedIn profiles after {INGEST_WRITE_ATTEMPTS} attempts: "
+                     f"{', '.join(profile_ids)}")
+        for url in urls:
+            if not url:
+                continue
+            try:
+                self._store_factory().release_enrichment(url)
+            except Exception as e:
+                logger.error(f"Error releasing the enrichment claim for {url}: {str(e)}")
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued profile has been written (or dropped)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write the remaining profiles and stop the flusher thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get ingestion counters.
+
+        Returns:
+            Dictionary with queued, accepted, rejected, flushed, batches and dropped counts
+        """
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+_ingest_queue: Optional[IngestQueue] = None
+_ingest_queue_lock = threading.Lock()
+
+def get_ingest_queue() -> Optional[IngestQueue]:
+    """
+    Get the process-wide ingest queue, creating it on first use.
+
+    Returns:
+        Shared IngestQueue, or None if INGEST_QUEUE_SIZE is 0 (synchronous writes)
+    """
+    global _ingest_queue
+    if INGEST_QUEUE_SIZE <= 0:
+        return None
+    if _ingest_queue is None:
+        with _ingest_queue_lock:
+            if _ingest_queue is None:
+                _ingest_queue = IngestQueue()
+    return _ingest_queue
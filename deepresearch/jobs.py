@@ -0,0 +1,390 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from deepresearch.batch import finish_record, job_config
+from deepresearch.cache import CACHE_DIR
+from deepresearch.checkpoint import invoke_resumable
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding the job queue, shared by every service process using it
+JOB_DB = os.environ.get("JOB_DB", os.path.join(CACHE_DIR, "jobs.sqlite"))
+
+# Research runs executed concurrently by each service process
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+
+# Most jobs of a single caller running at once; further jobs wait in the queue
+JOB_MAX_PER_CALLER = int(os.environ.get("JOB_MAX_PER_CALLER", "2"))
+
+# Queued jobs before new submissions are rejected
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "1000"))
+
+# Seconds finished jobs and their results are kept for status and result requests
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+
+# Seconds idle workers wait before checking for jobs queued by other processes
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+
+# Seconds a rejected caller is asked to wait before resubmitting
+JOB_RETRY_AFTER = int(os.environ.get("JOB_RETRY_AFTER", "5"))
+
+# Most research loops a job may request
+JOB_MAX_LOOPS = int(os.environ.get("JOB_MAX_LOOPS", "10"))
+
+# Most seconds a job's research loops may wait for pending Clay enrichments
+JOB_MAX_ENRICHMENT_WAIT = float(os.environ.get("JOB_MAX_ENRICHMENT_WAIT", "300"))
+
+# Job fields only returned with the result
+RESULT_FIELDS = ("running_summary", "leads")
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Job fields stored in their own columns rather than in the JSON record
+COLUMN_FIELDS = ("id", "caller", "priority", "status", "submitted_at", "started_at", "finished_at")
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class JobService:
+    """
+    Priority queue of research jobs run by a bounded pool of worker threads.
+
+    Jobs live in SQLite, so every process serving the API (e.g. each gunicorn
+    worker) shares one queue: any process can answer for any job, and each
+    runs up to `workers` of them. Workers live as long as the process, so every
+    job reuses the compiled graph, pooled HTTP sessions and caches. Higher
+    priorities run first and jobs of equal priority run in submission order,
+    except that a caller never has more than max_per_caller jobs running
+    across all processes: their next job waits while other callers' jobs go
+    ahead.
+
+    Workers start on the first submit, so a service created before a server
+    forks its workers starts threads in each worker rather than in the parent,
+    and processes that only answer status requests or health checks never
+    load the graph. Jobs run on a graph checkpointed under their job id, so a
+    job left running by a process that died is queued again and resumes from
+    the last node it completed.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_per_caller: int = JOB_MAX_PER_CALLER,
+                 max_queued: int = JOB_QUEUE_SIZE, result_ttl: float = JOB_RESULT_TTL,
+                 graph: Optional[Any] = None, db_path: str = JOB_DB,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        """
+        Args:
+            workers: Jobs run concurrently by this process
+            max_per_caller: Jobs of one caller run concurrently
+            max_queued: Queued jobs before submit raises JobQueueFull
+            result_ttl: Seconds finished jobs are kept
+            graph: Compiled graph to run (defaults to the graph compiled with the
+                SQLite checkpointer, built once per process)
+            db_path: SQLite file holding the queue
+            poll_interval: Seconds idle workers wait between checks for new jobs
+        """
+        self.workers = max(1, workers)
+        self.max_per_caller = max(1, max_per_caller)
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.db_path = db_path
+        self._graph = graph
+        self._graph_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " caller TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " submitted_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " worker_pid INTEGER,"
+            " record TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, seq)")
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def _transaction(self, work):
+        """Run work() in an IMMEDIATE transaction, serialized with other threads and processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _ensure_started(self) -> None:
+        with self._cond:
+            if self._threads and all(thread.is_alive() for thread in self._threads):
+                return
+            if not self._threads:
+                atexit.register(self.close)
+                self._recover()
+            self._stopping = False
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f"research-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _recover(self) -> None:
+        """Queue again the jobs left running by processes that no longer exist."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, worker_pid FROM jobs WHERE status = 'running'").fetchall()
+        orphaned = [(job_id, pid) for job_id, pid in rows if pid != os.getpid() and not _process_alive(pid)]
+        if not orphaned:
+            return
+
+        def work():
+            # Another process may have requeued and claimed the job in the meantime
+            return [job_id for job_id, pid in orphaned if self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, worker_pid = NULL"
+                " WHERE id = ? AND status = 'running' AND worker_pid = ?", (job_id, pid)
+            ).rowcount]
+
+        for job_id in self._transaction(work):
+            logger.warning(f"Requeued job {job_id} left running by a stopped process")
+
+    def _compiled_graph(self) -> Any:
+        """The graph jobs run on, compiled with the SQLite checkpointer on first use."""
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    from deepresearch.checkpoint import get_checkpointer
+                    from deepresearch.graph import compile_graph
+                    self._graph = compile_graph(get_checkpointer())
+        return self._graph
+
+    def submit(self, lead_criteria: str, caller: str = "anonymous", priority: int = 0,
+               max_loops: int = 3, enrichment_wait: float = 0.0) -> Dict[str, Any]:
+        """
+        Queue a research job.
+
+        Args:
+            lead_criteria: Criteria for lead generation
+            caller: Identity the per-caller concurrency limit applies to
+            priority: Jobs with higher priority run first
+            max_loops: Maximum research loops, capped at JOB_MAX_LOOPS
+            enrichment_wait: Seconds each research loop waits for pending Clay
+                enrichments, capped at JOB_MAX_ENRICHMENT_WAIT
+
+        Returns:
+            The job's status
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        self._ensure_started()
+        job = {
+            "id": uuid.uuid4().hex,
+            "lead_criteria": lead_criteria,
+            "caller": caller,
+            "priority": priority,
+            "max_loops": min(max(1, max_loops), JOB_MAX_LOOPS),
+            "enrichment_wait_seconds": min(max(0.0, enrichment_wait), JOB_MAX_ENRICHMENT_WAIT),
+            "status": "queued",
+            "submitted_at": time.time()
+        }
+
+        def work():
+            self._prune()
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._conn.execute(
+                "INSERT INTO jobs (id, caller, priority, status, submitted_at, record) VALUES (?, ?, ?, ?, ?, ?)",
+                (job["id"], caller, priority, job["status"], job["submitted_at"], self._record(job))
+            )
+
+        self._transaction(work)
+        with self._cond:
+            self._cond.notify()
+        logger.info(f"Queued job {job['id']} for {caller} with priority {priority}")
+        return self._view(job)
+
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status.
+
+        Args:
+            job_id: Id returned by submit
+            include_result: Also return the summary and leads of a finished job
+
+        Returns:
+            The job's status, or None if it is unknown or has expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMN_FIELDS)}, record FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._view(self._job(row), include_result) if row is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started yet.
+
+        Args:
+            job_id: Id returned by submit
+
+        Returns:
+            True if the job was cancelled, False if it is unknown or already started
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+        if cursor.rowcount == 0:
+            return False
+        logger.info(f"Cancelled job {job_id}")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get job counters.
+
+        Returns:
+            Dictionary with the number of jobs in each status and this process's worker count
+        """
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        with self._lock:
+            counts.update(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        counts["workers"] = self.workers
+        return counts
+
+    def close(self) -> None:
+        """Stop starting queued jobs; jobs already running finish in their daemon threads."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    @staticmethod
+    def _record(job: Dict[str, Any]) -> str:
+        return json.dumps({key: value for key, value in job.items() if key not in COLUMN_FIELDS})
+
+    @staticmethod
+    def _job(row) -> Dict[str, Any]:
+        job = {key: value for key, value in zip(COLUMN_FIELDS, row) if value is not None}
+        job.update(json.loads(row[-1]))
+        return job
+
+    @staticmethod
+    def _view(job: Dict[str, Any], include_result: bool = False) -> Dict[str, Any]:
+        if include_result:
+            return dict(job)
+        return {key: value for key, value in job.items() if key not in RESULT_FIELDS}
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than result_ttl (caller holds a transaction)."""
+        placeholders = ",".join("?" * len(FINISHED_STATUSES))
+        self._conn.execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+            (*FINISHED_STATUSES, time.time() - self.result_ttl)
+        )
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the highest-priority queued job whose caller is under its limit as running, and return it."""
+        def work():
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMN_FIELDS)}, record FROM jobs"
+                " WHERE status = 'queued' AND caller NOT IN"
+                " (SELECT caller FROM jobs WHERE status = 'running' GROUP BY caller HAVING COUNT(*) >= ?)"
+                " ORDER BY priority DESC, seq LIMIT 1",
+                (self.max_per_caller,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._job(row)
+            job.update(status="running", started_at=time.time())
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ? WHERE id = ?",
+                (job["started_at"], os.getpid(), job["id"])
+            )
+            return job
+
+        return self._transaction(work)
+
+    def _finish(self, job: Dict[str, Any]) -> None:
+        job["finished_at"] = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, record = ? WHERE id = ?",
+                (job["status"], job["finished_at"], self._record(job), job["id"])
+            )
+        # The caller's freed slot may unblock jobs other workers skipped
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        graph = self._compiled_graph()
+
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+            job = self._claim()
+            if job is None:
+                # Jobs queued or slots freed by other processes are picked up on the next poll
+                self._recover()
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(self.poll_interval)
+                continue
+
+            started = time.monotonic()
+            result, error = None, None
+            try:
+                result = invoke_resumable(graph, {"research_topic": job["lead_criteria"]},
+                                          job_config(job, job["max_loops"], "job"))
+            except Exception as e:
+                error = e
+
+            finish_record(job, started, result=result, error=error)
+            self._finish(job)
+            logger.info(f"Job {job['id']} {job['status']} in {job['duration_seconds']}s")
+
+_job_service: Optional[JobService] = None
+_job_service_lock = threading.Lock()
+
+def get_job_service() -> JobService:
+    """
+    Get the process-wide job service, creating it on first use.
+
+    Returns:
+        Shared JobService
+    """
+    global _job_service
+    if _job_service is None:
+        with _job_service_lock:
+            if _job_service is None:
+                _job_service = JobService()
+    return _job_service
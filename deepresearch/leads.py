@@ -0,0 +1,197 @@
+import re
+import json
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from deepresearch.profile_store import normalize_profile_id
+from deepresearch.state import LeadRecord
+
+# Tokens ignored when comparing names and companies
+NAME_STOPWORDS = {"dr", "mr", "mrs", "ms", "miss", "prof", "jr", "sr", "ii", "iii", "iv", "phd", "mba", "md", "cpa"}
+COMPANY_STOPWORDS = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+                     "gmbh", "ag", "sa", "sas", "bv", "plc", "pty", "the"}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def _tokens(text: str, stopwords: set) -> List[str]:
+    """Lowercase, accent-stripped alphanumeric tokens of text without stopwords."""
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [token for token in _NON_ALNUM.split(ascii_text) if token and token not in stopwords]
+
+def linkedin_profile_url(linkedin_id: str) -> str:
+    """Canonical LinkedIn profile URL for a normalized profile id."""
+    return f"https://www.linkedin.com/in/{linkedin_id}" if linkedin_id else ""
+
+def fuzzy_key(lead: Dict[str, Any]) -> Optional[str]:
+    """
+    Fuzzy identity of a lead from its name and company.
+
+    Only the first and last name tokens are used, so middle names, initials,
+    honorifics and punctuation do not split one person into two leads. Legal
+    suffixes such as "Inc." are ignored on the company.
+
+    Args:
+        lead: Lead record
+
+    Returns:
+        Key string, or None if the lead has no usable name or is identified
+        by a single name token with no company
+    """
+    name_tokens = _tokens(lead.get("name", ""), NAME_STOPWORDS)
+    company_tokens = _tokens(lead.get("company", ""), COMPANY_STOPWORDS)
+    if not name_tokens or (len(name_tokens) == 1 and not company_tokens):
+        return None
+    return f"{name_tokens[0]} {name_tokens[-1]}|{' '.join(company_tokens)}"
+
+def make_lead(raw_lead: Dict[str, Any]) -> Optional[LeadRecord]:
+    """
+    Build a lead record from a loosely structured dictionary.
+
+    Accepts either a "linkedin_id" or a "linkedin_url" and normalizes it to a
+    profile id.
+
+    Args:
+        raw_lead: Dictionary with name, title, company, linkedin_url/linkedin_id and source_urls
+
+    Returns:
+        Lead record, or None if the dictionary has no name
+    """
+    name = str(raw_lead.get("name") or "").strip()
+    if not name:
+        return None
+    linkedin = raw_lead.get("linkedin_id") or raw_lead.get("linkedin_url") or ""
+    source_urls = raw_lead.get("source_urls") or []
+    if not isinstance(source_urls, list):
+        source_urls = [source_urls]
+    lead: LeadRecord = {
+        "name": name,
+        "title": str(raw_lead.get("title") or "").strip(),
+        "company": str(raw_lead.get("company") or "").strip(),
+        "linkedin_id": normalize_profile_id(str(linkedin)) if linkedin else "",
+        "source_urls": list(dict.fromkeys(str(url) for url in source_urls if url))
+    }
+    notes = str(raw_lead.get("notes") or "").strip()
+    if notes:
+        lead["notes"] = notes
+    return lead
+
+def parse_leads(content: str) -> List[LeadRecord]:
+    """
+    Parse the leads extracted by the LLM in JSON mode.
+
+    Args:
+        content: JSON response content with a "leads" list
+
+    Returns:
+        Lead records; entries without a name are dropped
+    """
+    try:
+        payload = json.loads(content)
+    except json.JSONDecodeError:
+        return []
+    raw_leads = payload.get("leads", []) if isinstance(payload, dict) else payload
+    if not isinstance(raw_leads, list):
+        return []
+    leads = (make_lead(raw_lead) for raw_lead in raw_leads if isinstance(raw_lead, dict))
+    return [lead for lead in leads if lead is not None]
+
+def _absorb(target: LeadRecord, lead: LeadRecord) -> None:
+    """Fill missing fields of target from lead and union their source URLs."""
+    for field in ("title", "company", "linkedin_id", "notes"):
+        if not target.get(field) and lead.get(field):
+            target[field] = lead[field]
+    for url in lead.get("source_urls", []):
+        if url not in target["source_urls"]:
+            target["source_urls"].append(url)
+
+def merge_leads(existing: Iterable[LeadRecord], new: Iterable[LeadRecord]) -> Tuple[List[LeadRecord], int]:
+    """
+    Deduplicate and merge lead records in a single pass.
+
+    Leads are matched through two hash indexes, one on LinkedIn id and one on
+    the fuzzy name+company key, so merging n leads costs O(n). Leads with
+    different LinkedIn ids are never merged, even if their names match.
+
+    Args:
+        existing: Leads collected so far (kept first, in order)
+        new: Leads to merge in
+
+    Returns:
+        Tuple of the merged lead list and the number of leads from new that
+        did not match an existing lead
+    """
+    merged: List[LeadRecord] = []
+    by_linkedin_id: Dict[str, LeadRecord] = {}
+    by_fuzzy_key: Dict[str, LeadRecord] = {}
+
+    def add(lead: LeadRecord) -> None:
+        linkedin_id = lead.get("linkedin_id", "")
+        key = fuzzy_key(lead)
+        match = by_linkedin_id.get(linkedin_id) if linkedin_id else None
+        if match is None and key is not None:
+            candidate = by_fuzzy_key.get(key)
+            if candidate is not None and not (linkedin_id and candidate.get("linkedin_id")):
+                match = candidate
+        if match is not None:
+            _absorb(match, lead)
+        else:
+            match = dict(lead, source_urls=list(lead.get("source_urls", [])))
+            merged.append(match)
+        if match.get("linkedin_id"):
+            by_linkedin_id.setdefault(match["linkedin_id"], match)
+        if key is not None:
+            by_fuzzy_key.setdefault(key, match)
+
+    for lead in existing:
+        add(lead)
+    existing_count = len(merged)
+    for lead in new:
+        add(lead)
+    return merged, len(merged) - existing_count
+
+def dedupe_profiles(profiles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse LinkedIn profiles that refer to the same person.
+
+    A completed profile replaces a pending placeholder for the same id.
+
+    Args:
+        profiles: Profile dictionaries with a "url" key
+
+    Returns:
+        One profile per normalized LinkedIn id, in first-seen order
+    """
+    unique: Dict[str, Dict[str, Any]] = {}
+    for profile in profiles:
+        profile_id = normalize_profile_id(profile.get("url", ""))
+        current = unique.get(profile_id)
+        if current is None or (current.get("status") == "pending" and profile.get("status") != "pending"):
+            unique[profile_id] = profile
+    return list(unique.values())
+
+def format_leads(leads: List[LeadRecord]) -> str:
+    """
+    Render leads as a readable list for the summary and reflection prompt.
+
+    Args:
+        leads: Lead records
+
+    Returns:
+        Markdown list with one lead per line
+    """
+    if not leads:
+        return "No leads found yet."
+
+    lines = []
+    for i, lead in enumerate(leads, 1):
+        line = f"{i}. {lead['name']}"
+        if lead.get("title"):
+            line += f" - {lead['title']}"
+        if lead.get("company"):
+            line += f" at {lead['company']}"
+        if lead.get("linkedin_id"):
+            line += f" | {linkedin_profile_url(lead['linkedin_id'])}"
+        if lead.get("notes"):
+            line += f"\n   {lead['notes']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,76 +1,208 @@
-from flask import Flask, request, jsonify
-import requests
+from flask import Flask, Response, request, jsonify
 import os
-import json
 import logging
-from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("linkedin_service.log"),
-        logging.StreamHandler()
-    ]
-)
+from deepresearch.enrichment import enrichment
+from deepresearch.ingest import INGEST_RETRY_AFTER, get_ingest_queue
+from deepresearch.jobs import FINISHED_STATUSES, JOB_RETRY_AFTER, JobQueueFull, get_job_service
+from deepresearch.metrics import metrics
+from deepresearch.profile_store import get_profile_store, normalize_profile_id
+
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Directory to store received profiles
-PROFILES_DIR = "linkedin_profiles"
-os.makedirs(PROFILES_DIR, exist_ok=True)
+def configure_logging():
+    """
+    Log to linkedin_service.log and the console
+    
+    Called by the service entry points rather than at import, and a no-op if
+    the application has already configured logging.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("linkedin_service.log"),
+            logging.StreamHandler()
+        ]
+    )
 
 @app.route('/webhook/clay-callback', methods=['POST'])
 def clay_callback():
     """
     Endpoint to receive webhook callbacks from Clay
+    
+    Accepts one profile or a list of profiles. Profiles are queued and written
+    to the profile store in batches, so the callback is acknowledged with 202
+    right away; when the queue is full the sender gets 503 with Retry-After.
     """
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         
         if not data:
             return jsonify({"error": "No data received"}), 400
         
-        # Generate a filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        profile_id = data.get('url', '').split('/')[-1] if 'url' in data else 'unknown'
-        filename = f"{profile_id}_{timestamp}.json"
-        file_path = os.path.join(PROFILES_DIR, filename)
+        profiles = data if isinstance(data, list) else [data]
+        if not all(isinstance(profile, dict) for profile in profiles):
+            return jsonify({"error": "Expected a profile object or a list of profile objects"}), 400
+        profile_ids = [normalize_profile_id(profile.get("url") or "") for profile in profiles]
+        if "unknown" in profile_ids:
+            return jsonify({"error": "Every profile needs a LinkedIn profile url"}), 400
         
-        # Save the profile data
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        ingest_queue = get_ingest_queue()
+        if ingest_queue is None:
+            # Synchronous mode: save the profile data to the shared profile store
+            get_profile_store().put_many(profiles)
+            enrichment.resolve(profiles)
+            status_code = 200
+        else:
+            for i, profile in enumerate(profiles):
+                if not ingest_queue.submit(profile):
+                    logger.warning(f"Ingest queue full, rejecting {len(profiles) - i} LinkedIn profiles")
+                    response = jsonify({"error": "Ingest queue is full, retry later", "accepted": profile_ids[:i]})
+                    response.headers["Retry-After"] = str(INGEST_RETRY_AFTER)
+                    return response, 503
+            status_code = 202
         
-        logger.info(f"Received and saved profile data via webhook: {filename}")
+        logger.debug(f"Received profile data via webhook: {', '.join(profile_ids)}")
         
-        return jsonify({
+        body = {
             "status": "success", 
-            "message": "Profile data received and saved", 
-            "file": filename
-        })
+            "message": "Profile data received",
+            "profile_id": profile_ids[0]
+        }
+        if isinstance(data, list):
+            body["profile_ids"] = profile_ids
+        return jsonify(body), status_code
     
     except Exception as e:
         logger.error(f"Error handling webhook callback: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def _caller_id(data):
+    """
+    Identify the caller that per-caller job limits apply to
+    
+    Uses the X-Caller-Id header, then a "caller" field in the body, then the client address.
+    Clients can choose any id, so the limits only hold when the service sits behind a
+    proxy that authenticates callers and sets X-Caller-Id itself.
+    """
+    return request.headers.get("X-Caller-Id") or data.get("caller") or request.remote_addr or "anonymous"
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a research job
+    
+    Expects a JSON body with lead_criteria and optional priority (higher runs
+    first), max_loops and enrichment_wait_seconds. Answers 202 with the job
+    status and its URL; when the job queue is full the caller gets 503 with
+    Retry-After.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get("lead_criteria"):
+        return jsonify({"error": "Expected a JSON object with lead_criteria"}), 400
+    try:
+        priority = int(data.get("priority", 0))
+        max_loops = int(data.get("max_loops", 3))
+        enrichment_wait = float(data.get("enrichment_wait_seconds", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "priority and max_loops must be integers and enrichment_wait_seconds a number"}), 400
+    
+    try:
+        job = get_job_service().submit(str(data["lead_criteria"]), caller=str(_caller_id(data)),
+                                       priority=priority, max_loops=max_loops,
+                                       enrichment_wait=enrichment_wait)
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(JOB_RETRY_AFTER)
+        return response, 503
+    
+    response = jsonify(job)
+    response.headers["Location"] = f"/jobs/{job['id']}"
+    return response, 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Status of a research job
+    """
+    job = get_job_service().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """
+    Result of a research job
+    
+    Answers 200 with the summary and leads once the job has finished, or 202
+    with its status while it is still queued or running.
+    """
+    job = get_job_service().get(job_id, include_result=True)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] not in FINISHED_STATUSES:
+        return jsonify(job), 202
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a research job that has not started yet
+    """
+    service = get_job_service()
+    if service.cancel(job_id):
+        return jsonify(service.get(job_id))
+    job = service.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"error": f"Job is already {job['status']}"}), 409
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
     Simple health check endpoint
     """
-    return jsonify({"status": "ok", "message": "LinkedIn service is running"})
+    ingest_queue = get_ingest_queue()
+    return jsonify({
+        "status": "ok",
+        "message": "LinkedIn service is running",
+        "ingest": ingest_queue.stats() if ingest_queue is not None else None,
+        "pending_enrichments": get_profile_store().pending_enrichments(),
+        "jobs": get_job_service().stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Per-node latency, token, HTTP and cache metrics in Prometheus text format
+    """
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/metrics.json', methods=['GET'])
+def json_metrics():
+    """
+    Per-node and per-run metrics as JSON
+    """
+    return jsonify(metrics.snapshot())
 
 def start_service(port=8080):
     """
-    Start the Flask service
+    Start the Flask service on the built-in threaded server
+    
+    For production, run the WSGI app under a multi-worker server instead,
+    e.g. gunicorn -w 4 --threads 8 -b 0.0.0.0:8080 deepresearch.wsgi:app
     
     Args:
         port: Port number to run the service on
     """
-    app.run(host='0.0.0.0', port=port, debug=False)
+    configure_logging()
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
 
 if __name__ == '__main__':
+    configure_logging()
     port = int(os.environ.get('FLASK_RUN_PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
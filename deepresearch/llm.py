@@ -0,0 +1,143 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_openai import ChatOpenAI
+
+from deepresearch.cache import DiskCache, get_llm_response_cache, make_cache_key
+from deepresearch.metrics import record_cache
+
+class DiskLLMCache(BaseCache):
+    """
+    LangChain cache backed by the on-disk LLM response cache.
+
+    Entries are keyed on the model's llm_string (model name, response format
+    and other call parameters) plus the serialized prompt messages, and
+    expire by the DiskCache TTL and LRU limits.
+    """
+
+    def __init__(self, disk_cache: DiskCache, read: bool = True):
+        """
+        Args:
+            disk_cache: Cache the responses are stored in
+            read: Whether lookups are served; False bypasses the cache while
+                still refreshing it with the new responses
+        """
+        self.disk_cache = disk_cache
+        self.read = read
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return make_cache_key("llm", llm_string, prompt)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        if not self.read:
+            return None
+        value = self.disk_cache.get(self._key(prompt, llm_string))
+        record_cache(value is not None)
+        if value is None:
+            return None
+        return [loads(generation) for generation in value]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        self.disk_cache.set(self._key(prompt, llm_string), [dumps(generation) for generation in return_val])
+
+    def clear(self, **kwargs: Any) -> None:
+        self.disk_cache.clear()
+
+def cached_response(client: Any, messages: Sequence[Any]) -> Optional[Any]:
+    """
+    Get the response a client's LLM cache holds for messages, without calling the API.
+
+    Uses the same key LangChain looks the call up under, so callers can skip
+    rate limiting for prompts that will not reach the provider.
+
+    Args:
+        client: Chat model from get_chat_model
+        messages: Prompt messages the client would be invoked with
+
+    Returns:
+        The cached message, or None on a miss or when the client's cache is not read
+    """
+    cache = getattr(client, "cache", None)
+    if not isinstance(cache, DiskLLMCache) or not cache.read:
+        return None
+    generations = cache.lookup(dumps(list(messages)), client._get_llm_string(stop=None))
+    return generations[0].message if generations else None
+
+# Cache modes: None (no caching), "read_write" or "refresh" (write only)
+_caches: Dict[str, DiskLLMCache] = {}
+
+def _response_cache(mode: Optional[str]) -> Any:
+    """LangChain cache for a cache mode; False disables any global cache."""
+    if mode is None:
+        return False
+    cache = _caches.get(mode)
+    if cache is None:
+        cache = _caches[mode] = DiskLLMCache(get_llm_response_cache(), read=(mode != "refresh"))
+    return cache
+
+_clients: Dict[Tuple[str, Optional[str], str, Optional[str]], ChatOpenAI] = {}
+_clients_lock = threading.Lock()
+
+# Builds a client from (model, api_key, response_format, cache); replaceable for offline benchmarks
+_factory: Optional[Callable[..., Any]] = None
+
+def set_chat_model_factory(factory: Optional[Callable[..., Any]]) -> None:
+    """
+    Replace how chat model clients are built, e.g. with a local stand-in.
+
+    Clears the registry so subsequent lookups use the new factory.
+
+    Args:
+        factory: Callable taking (model, api_key, response_format, cache) and
+            returning a chat model, or None to restore ChatOpenAI
+    """
+    global _factory
+    with _clients_lock:
+        _factory = factory
+        _clients.clear()
+
+def get_chat_model(model: str, api_key: Optional[str] = None,
+                   response_format: Optional[Dict[str, Any]] = None,
+                   cache: Optional[str] = None) -> ChatOpenAI:
+    """
+    Get a long-lived chat model client, creating it on first use.
+
+    Clients are keyed by (model, api_key, response_format, cache) and shared
+    across nodes, loops and concurrent runs, so their underlying HTTP connection
+    pools stay warm instead of being rebuilt on every call.
+
+    Args:
+        model: OpenAI model name
+        api_key: OpenAI API key
+        response_format: Optional response format, e.g. {"type": "json_object"}
+        cache: None for no response caching, "read_write" to serve identical
+            prompts from the local LLM response cache, or "refresh" to bypass
+            cached responses while storing new ones
+
+    Returns:
+        Shared ChatOpenAI client
+    """
+    key = (model, api_key, json.dumps(response_format, sort_keys=True), cache)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                if _factory is not None:
+                    client = _factory(model, api_key, response_format, _response_cache(cache))
+                else:
+                    kwargs = {"model": model, "api_key": api_key, "cache": _response_cache(cache)}
+                    if response_format is not None:
+                        kwargs["response_format"] = response_format
+                    client = ChatOpenAI(**kwargs)
+                _clients[key] = client
+    return client
+
+def clear_chat_models() -> None:
+    """Drop all cached chat model clients."""
+    with _clients_lock:
+        _clients.clear()
@@ -0,0 +1,281 @@
+import time
+import inspect
+import functools
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Number of recent latency samples kept per span for percentiles
+LATENCY_SAMPLES = 2048
+
+# Number of runs whose per-run metrics are retained
+MAX_TRACKED_RUNS = 1000
+
+# (run_id, span) of the innermost instrumented call in the current context
+_current_span: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar(
+    "deepresearch_current_span", default=("default", "unattributed")
+)
+
+COUNTER_FIELDS = (
+    "calls", "errors", "wall_seconds", "prompt_tokens", "completion_tokens",
+    "http_requests", "http_bytes_sent", "http_bytes_received", "cache_hits", "cache_misses"
+)
+
+def _new_counters() -> Dict[str, Any]:
+    counters: Dict[str, Any] = {field: 0 for field in COUNTER_FIELDS}
+    counters["wall_seconds"] = 0.0
+    return counters
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class MetricsRegistry:
+    """
+    In-process metrics for graph nodes and provider calls.
+
+    Counters are aggregated per span (node or utility name) across all runs,
+    and per run for the most recent MAX_TRACKED_RUNS runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: Dict[str, Dict[str, Any]] = {}
+        self._latencies: Dict[str, deque] = {}
+        self._runs: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+
+    def _counters(self, run_id: str, span: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Aggregate and per-run counters for a span; caller holds the lock."""
+        aggregate = self._spans.setdefault(span, _new_counters())
+        run = self._runs.get(run_id)
+        if run is None:
+            run = self._runs[run_id] = {}
+            while len(self._runs) > MAX_TRACKED_RUNS:
+                self._runs.popitem(last=False)
+        return aggregate, run.setdefault(span, _new_counters())
+
+    def add(self, run_id: str, span: str, **increments: float) -> None:
+        """Add increments to the counters of a span."""
+        with self._lock:
+            for counters in self._counters(run_id, span):
+                for field, value in increments.items():
+                    counters[field] += value
+
+    def observe_call(self, run_id: str, span: str, seconds: float, error: bool) -> None:
+        """Record one completed call of a span."""
+        with self._lock:
+            for counters in self._counters(run_id, span):
+                counters["calls"] += 1
+                counters["errors"] += int(error)
+                counters["wall_seconds"] += seconds
+            self._latencies.setdefault(span, deque(maxlen=LATENCY_SAMPLES)).append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get all metrics as a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with per-span aggregates (including p50/p99 latency)
+            and per-run counters
+        """
+        with self._lock:
+            spans = {}
+            for span, counters in self._spans.items():
+                samples = list(self._latencies.get(span, ()))
+                spans[span] = dict(
+                    counters,
+                    p50_seconds=_percentile(samples, 0.50),
+                    p99_seconds=_percentile(samples, 0.99)
+                )
+            runs = {run_id: {span: dict(counters) for span, counters in run.items()}
+                    for run_id, run in self._runs.items()}
+        return {"spans": spans, "runs": runs}
+
+    def run_metrics(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the per-span counters of a single run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            Counters keyed by span name (empty if the run is unknown)
+        """
+        with self._lock:
+            return {span: dict(counters) for span, counters in self._runs.get(run_id, {}).items()}
+
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._spans.clear()
+            self._latencies.clear()
+            self._runs.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Render span aggregates in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text suitable for a /metrics endpoint
+        """
+        snapshot = self.snapshot()["spans"]
+        lines = []
+        for field in COUNTER_FIELDS:
+            metric = f"deepresearch_{field}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for span, counters in sorted(snapshot.items()):
+                lines.append(f'{metric}{{span="{span}"}} {counters[field]}')
+        lines.append("# TYPE deepresearch_latency_seconds summary")
+        for quantile, key in (("0.5", "p50_seconds"), ("0.99", "p99_seconds")):
+            for span, counters in sorted(snapshot.items()):
+                lines.append(f'deepresearch_latency_seconds{{span="{span}",quantile="{quantile}"}} {counters[key]}')
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+def run_id_from_config(config: Optional[Dict[str, Any]]) -> str:
+    """
+    Get the run identifier from a runnable config.
+
+    Uses configurable.run_id, then configurable.thread_id, then "default".
+
+    Args:
+        config: Runnable config passed to a node
+
+    Returns:
+        Run identifier
+    """
+    configurable = (config or {}).get("configurable", {}) if isinstance(config, dict) else {}
+    return str(configurable.get("run_id") or configurable.get("thread_id") or "default")
+
+def instrument(span: str, node: bool = False) -> Callable:
+    """
+    Decorator recording wall time and errors of a sync or async function.
+
+    Token, HTTP and cache events recorded while the function runs are
+    attributed to this span. For graph nodes (node=True) the run id is taken
+    from the config argument; other spans inherit the run of their caller.
+
+    Args:
+        span: Span name, e.g. the node name or "tavily_search"
+        node: Whether the function is a LangGraph node taking (state, config)
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        def enter(args, kwargs):
+            if node:
+                config = kwargs.get("config", args[1] if len(args) > 1 else None)
+                run_id = run_id_from_config(config)
+            else:
+                run_id = _current_span.get()[0]
+            return run_id, _current_span.set((run_id, span))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                run_id, token = enter(args, kwargs)
+                started = time.perf_counter()
+                error = False
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    metrics.observe_call(run_id, span, time.perf_counter() - started, error)
+                    _current_span.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run_id, token = enter(args, kwargs)
+            started = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metrics.observe_call(run_id, span, time.perf_counter() - started, error)
+                _current_span.reset(token)
+        return wrapper
+    return decorator
+
+def llm_usage(message: Any) -> Tuple[int, int]:
+    """
+    Get the prompt and completion tokens reported on an LLM response message.
+
+    Args:
+        message: AIMessage returned by a chat model
+
+    Returns:
+        Tuple of (prompt tokens, completion tokens), zero when not reported
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens")
+    completion_tokens = usage.get("output_tokens")
+    if prompt_tokens is None:
+        token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens", 0)
+        completion_tokens = token_usage.get("completion_tokens", 0)
+    return prompt_tokens or 0, completion_tokens or 0
+
+def record_llm_usage(message: Any) -> None:
+    """
+    Record prompt and completion tokens reported on an LLM response message.
+
+    Args:
+        message: AIMessage returned by a chat model
+    """
+    prompt_tokens, completion_tokens = llm_usage(message)
+    run_id, span = _current_span.get()
+    metrics.add(run_id, span, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+def record_http(response: Any) -> None:
+    """
+    Record one HTTP exchange from a requests or httpx response.
+
+    Args:
+        response: Response whose request body and content sizes are counted
+    """
+    request = getattr(response, "request", None)
+    body = getattr(request, "body", None) if not hasattr(request, "content") else request.content
+    sent = len(body) if body else 0
+    sent += len(str(getattr(request, "url", "")))
+    run_id, span = _current_span.get()
+    metrics.add(run_id, span, http_requests=1, http_bytes_sent=sent, http_bytes_received=len(response.content or b""))
+
+def record_cache(hit: bool) -> None:
+    """
+    Record a cache lookup in the current span.
+
+    Args:
+        hit: Whether the lookup was served from cache
+    """
+    run_id, span = _current_span.get()
+    metrics.add(run_id, span, cache_hits=int(hit), cache_misses=int(not hit))
+
+def map_in_context(executor: Any, func: Callable, items: Iterable[Any]) -> Iterable[Any]:
+    """
+    executor.map that runs each call in a copy of the caller's context.
+
+    Thread pools do not inherit context variables, so without this, metrics
+    recorded in worker threads would lose their run and span attribution.
+
+    Args:
+        executor: concurrent.futures executor
+        func: Function to apply
+        items: Arguments, one per call
+
+    Returns:
+        Iterator of results in input order
+    """
+    items = list(items)
+    contexts = [contextvars.copy_context() for _ in items]
+    return executor.map(lambda context, item: context.run(func, item), contexts, items)
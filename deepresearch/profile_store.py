@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Directory to store received LinkedIn profiles
+PROFILES_DIR = "linkedin_profiles"
+
+# SQLite index holding the latest version of every profile
+PROFILES_DB = os.path.join(PROFILES_DIR, "profiles.db")
+
+# Seconds an unanswered Clay request blocks duplicate requests for the same profile
+CLAY_PENDING_TTL = float(os.environ.get("CLAY_PENDING_TTL", "3600"))
+
+def normalize_profile_id(profile_url: str) -> str:
+    """
+    Normalize a LinkedIn profile URL (or bare slug) to its profile id.
+
+    The id is the segment after /in/, so subpages such as
+    /in/<slug>/details/experience/ name the same profile. Trailing slashes,
+    query strings, fragments, percent-encoding and case differences all map
+    to the same id, so the same person is stored once. Control and invisible
+    format characters (e.g. an encoded zero-width space) are removed.
+
+    Args:
+        profile_url: LinkedIn profile URL or profile slug
+
+    Returns:
+        Normalized profile id, or 'unknown' if none can be derived
+    """
+    path = urlparse(profile_url).path if "://" in profile_url else profile_url.split("?")[0].split("#")[0]
+    segments = [segment for segment in path.split("/") if segment]
+    if "in" in segments:
+        segments = segments[segments.index("in") + 1:][:1]
+    if not segments:
+        return "unknown"
+    profile_id = "".join(char for char in unquote(segments[-1]) if unicodedata.category(char) not in ("Cc", "Cf"))
+    return profile_id.strip().lower() or "unknown"
+
+class ProfileStore:
+    """
+    Persistent, indexed store for LinkedIn profile data.
+
+    Profiles are keyed by normalized profile id, with each write replacing the
+    previous version, so lookups are a single primary-key read regardless of
+    how many profiles have been received.
+    """
+
+    def __init__(self, db_path: str = PROFILES_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " profile_id TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " data TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_enrichments ("
+            " profile_id TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " requested_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        if is_new:
+            self._import_legacy_files(directory or ".")
+
+    def _import_legacy_files(self, directory: str) -> None:
+        """Index profile JSON files written before the store existed."""
+        legacy_files = sorted(f for f in os.listdir(directory) if f.endswith(".json"))
+        if not legacy_files:
+            return
+        profiles = []
+        for filename in legacy_files:
+            try:
+                with open(os.path.join(directory, filename), "r") as f:
+                    profiles.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable profile file {filename}: {str(e)}")
+        # Files sort by "<id>_<timestamp>", so later versions overwrite earlier ones
+        self.put_many(profiles)
+        logger.info(f"Indexed {len(profiles)} existing LinkedIn profile files")
+
+    def get(self, profile_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest stored data for a profile.
+
+        Args:
+            profile_url: LinkedIn profile URL or profile id
+
+        Returns:
+            Profile data, or None if the profile has not been received yet
+        """
+        profile_id = normalize_profile_id(profile_url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE profile_id = ?", (profile_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, profile_data: Dict[str, Any]) -> str:
+        """
+        Store profile data, replacing any previous version.
+
+        Args:
+            profile_data: Profile data returned from Clay
+
+        Returns:
+            Normalized profile id the data was stored under
+
+        Raises:
+            ValueError: If the profile has no URL a profile id can be derived from
+        """
+        profile_ids = self.put_many([profile_data])
+        if not profile_ids:
+            raise ValueError("Profile data has no LinkedIn profile URL")
+        return profile_ids[0]
+
+    def put_many(self, profiles: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Store several profiles in a single transaction.
+
+        Args:
+            profiles: Profile data dictionaries returned from Clay
+
+        Returns:
+            Normalized profile ids of the stored profiles, in input order; profiles
+            without a usable URL are skipped rather than stored under one shared id
+        """
+        timestamp = datetime.now().isoformat()
+        rows = []
+        for profile_data in profiles:
+            url = profile_data.get("url") or ""
+            profile_id = normalize_profile_id(url) if url else "unknown"
+            if profile_id == "unknown":
+                logger.warning("Skipping profile data without a LinkedIn profile URL")
+                continue
+            rows.append((profile_id, url, json.dumps(profile_data), timestamp))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO profiles (profile_id, url, data, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                # Received profiles are no longer awaiting enrichment
+                self._conn.executemany(
+                    "DELETE FROM pending_enrichments WHERE profile_id = ?", [(row[0],) for row in rows]
+                )
+        return [row[0] for row in rows]
+
+    def claim_enrichment(self, profile_url: str, ttl_seconds: float) -> bool:
+        """
+        Record that an enrichment request for a profile is about to be sent.
+
+        Single-flight across threads, event loop tasks and processes sharing the
+        database: only the first caller gets True, until the profile arrives or
+        the claim is older than ttl_seconds (e.g. the callback was lost).
+
+        Args:
+            profile_url: LinkedIn profile URL
+            ttl_seconds: Seconds after which an unanswered request may be re-sent
+
+        Returns:
+            True if the caller should send the request, False if one is already in flight
+        """
+        profile_id = normalize_profile_id(profile_url)
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO pending_enrichments (profile_id, url, requested_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(profile_id) DO UPDATE SET url = excluded.url, requested_at = excluded.requested_at"
+                    " WHERE pending_enrichments.requested_at < ?",
+                    (profile_id, profile_url, now, now - ttl_seconds)
+                )
+                return cursor.rowcount > 0
+
+    def release_enrichment(self, profile_url: str) -> None:
+        """
+        Drop the pending record of a profile, e.g. because sending the request failed.
+
+        Args:
+            profile_url: LinkedIn profile URL
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM pending_enrichments WHERE profile_id = ?", (normalize_profile_id(profile_url),)
+                )
+
+    def pending_enrichments(self, ttl_seconds: float = CLAY_PENDING_TTL) -> int:
+        """
+        Count enrichment requests still awaiting a callback.
+
+        Args:
+            ttl_seconds: Claims older than this are not counted
+
+        Returns:
+            Number of in-flight enrichment requests
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pending_enrichments WHERE requested_at >= ?", (time.time() - ttl_seconds,)
+            ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+def get_profile_store() -> ProfileStore:
+    """
+    Get the process-wide profile store, opening it on first use.
+
+    Returns:
+        Shared ProfileStore instance
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+    return _store
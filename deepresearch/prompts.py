@@ -7,21 +7,22 @@ def get_current_date():
 # Query writer instructions
 query_writer_instructions = """You are a leads researcher assistant tasked with generating optimal search queries.
 
-Your goal is to create a search query that will return relevant leads based on the criteria provided.
+Your goal is to create {number_of_queries} search queries that will return relevant leads based on the criteria provided.
+The queries will be run in parallel, so make them diverse: each should target a different angle (roles, industries, regions, company stages or sources) rather than rephrase the same search.
 
 Current date: {current_date}
 
 The lead criteria you need to search for is: {research_topic}
 
-Follow these guidelines to create an effective search query:
+Follow these guidelines to create effective search queries:
 1. Be specific about the type of leads needed (e.g., specific roles, industries, company sizes)
 2. Use relevant keywords that would appear on LinkedIn profiles or company websites
 3. Include qualifying terms that match the criteria
-4. Format your output as a JSON object with a single key "query" containing your search query
+4. Format your output as a JSON object with a single key "queries" containing a list of your search queries
 
 For example:
 ```json
-{{"query": "your optimized lead search query here"}}
+{{"queries": ["your first optimized lead search query here", "a second query covering a different angle"]}}
 ```
 """
 
@@ -46,18 +47,41 @@ Your output should be a well-structured list of leads with all relevant informat
 organized in a way that makes it easy to take action on these leads.
 """
 
+# Lead extraction instructions for incremental summarization
+lead_extraction_instructions = """You are a lead generation assistant tasked with extracting leads from new research.
+
+You will receive the lead criteria, the latest search results, and any newly found LinkedIn profiles.
+Extract every person in this new material who is a promising lead for the criteria.
+
+For each lead, capture:
+- Full name and current role
+- Company
+- LinkedIn profile URL if available
+- The URLs of the sources mentioning them
+- A short note on why they match the criteria (seniority, company size/industry, relevant expertise, contact details if available)
+
+Only include people who appear in the material provided. Do not invent details.
+
+Format your output as a JSON object with a single key "leads" containing a list of leads, for example:
+```json
+{"leads": [{"name": "Jane Doe", "title": "VP of Engineering", "company": "Acme Health", "linkedin_url": "https://www.linkedin.com/in/janedoe", "source_urls": ["https://example.com/team"], "notes": "Leads a 40-person engineering team at a Series B healthcare startup"}]}
+```
+
+If the material contains no leads, return {"leads": []}.
+"""
+
 # Reflection instructions
 reflection_instructions = """You are a lead researcher assistant tasked with improving lead search quality.
 
 Your job is to:
 1. Analyze the current lead search results for: {research_topic}
 2. Identify gaps in the current set of leads (missing industries, roles, regions, etc.)
-3. Determine what additional search could yield better-qualified leads
-4. Format your output as a JSON object with a single key "query" containing your search query
+3. Determine what additional searches could yield better-qualified leads
+4. Format your output as a JSON object with a single key "queries" containing a list of {number_of_queries} diverse follow-up search queries, each targeting a different gap
 
 For example:
 ```json
-{{"query": "your specific follow-up lead search query here"}}
+{{"queries": ["your specific follow-up lead search query here", "another query targeting a different gap"]}}
 ```
 
 Consider these questions when identifying how to improve the lead search:
@@ -0,0 +1,212 @@
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-provider limits, overridable via environment (0 disables a limit)
+RATE_LIMITS_PER_MINUTE = {
+    "openai": float(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "0")),
+    "openai_tokens": float(os.environ.get("OPENAI_TOKENS_PER_MINUTE", "0")),
+    "tavily": float(os.environ.get("TAVILY_REQUESTS_PER_MINUTE", "0")),
+    "clay": float(os.environ.get("CLAY_REQUESTS_PER_MINUTE", "0")),
+}
+
+# Hard cap on Clay enrichment requests per rolling 24 hours (0 disables)
+CLAY_DAILY_LIMIT = int(os.environ.get("CLAY_DAILY_LIMIT", "0"))
+
+# SQLite file shared by processes that should draw from the same quotas;
+# unset keeps the buckets in process memory
+RATE_LIMIT_DB = os.environ.get("RATE_LIMIT_DB", "")
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to wait longer than its max_wait."""
+
+class TokenBucket:
+    """
+    Token bucket limiter, implemented as a generic cell rate algorithm.
+
+    Each acquire reserves its tokens under a lock by advancing the bucket's
+    theoretical arrival time, then sleeps until its reservation is due. Callers
+    are therefore served in arrival order, and concurrent runs are spaced out
+    at the configured rate rather than bursting into 429s and retrying.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: Optional[float] = None):
+        """
+        Args:
+            name: Bucket name, e.g. the provider
+            per_minute: Tokens replenished per minute
+            burst: Tokens that may be taken at once after an idle period
+                (defaults to one second's worth, at least 1)
+        """
+        self.name = name
+        self.interval = 60.0 / per_minute
+        self.burst = burst if burst is not None else max(1.0, per_minute / 60.0)
+        self._lock = threading.Lock()
+        self._tat = 0.0
+
+    def _update_tat(self, update: Callable[[float], Tuple[float, Any]]) -> Any:
+        """Replace the theoretical arrival time with update(current)[0] atomically; return update(current)[1]."""
+        with self._lock:
+            self._tat, result = update(self._tat)
+        return result
+
+    def _advance(self, amount: float, max_wait: Optional[float]) -> float:
+        """Reserve amount tokens and return seconds until the reservation is due."""
+        def update(current_tat: float) -> Tuple[float, float]:
+            now = time.time()
+            tat = max(current_tat, now) + amount * self.interval
+            wait = max(0.0, tat - self.burst * self.interval - now)
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitExceeded(f"Rate limit for {self.name} exceeded: next slot in {wait:.1f}s")
+            return tat, wait
+        return self._update_tat(update)
+
+    def reserve(self, amount: float = 1.0, max_wait: Optional[float] = None) -> float:
+        """
+        Reserve tokens without sleeping.
+
+        Args:
+            amount: Tokens to take (may be 0 or negative to charge or refund after the fact)
+            max_wait: Raise RateLimitExceeded instead of reserving if the wait would be longer
+
+        Returns:
+            Seconds the caller should wait before proceeding
+        """
+        return self._advance(amount, max_wait)
+
+    def acquire(self, amount: float = 1.0, max_wait: Optional[float] = None) -> None:
+        """Take tokens, sleeping until they are available."""
+        wait = self.reserve(amount, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def areserve(self, amount: float = 1.0, max_wait: Optional[float] = None) -> float:
+        """Async version of reserve."""
+        return self.reserve(amount, max_wait)
+
+    async def aacquire(self, amount: float = 1.0, max_wait: Optional[float] = None) -> None:
+        """Async version of acquire; other tasks keep running while this one waits."""
+        wait = await self.areserve(amount, max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Hold back every caller for seconds, e.g. after the provider returned 429."""
+        self._update_tat(lambda current_tat: (max(current_tat, time.time() + seconds + self.burst * self.interval), None))
+
+class SqliteTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in SQLite, shared by every process using the file.
+
+    Each reservation is a short IMMEDIATE transaction, so reservations from
+    different processes are serialized and stay in arrival order.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: Optional[float] = None, db_path: str = RATE_LIMIT_DB):
+        super().__init__(name, per_minute, burst)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    async def areserve(self, amount: float = 1.0, max_wait: Optional[float] = None) -> float:
+        # The transaction may wait on other processes, so keep it off the event loop
+        return await asyncio.to_thread(self.reserve, amount, max_wait)
+
+    def _update_tat(self, update: Callable[[float], Tuple[float, Any]]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tat FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                tat, result = update(row[0] if row else 0.0)
+                self._conn.execute("INSERT OR REPLACE INTO buckets (name, tat) VALUES (?, ?)", (self.name, tat))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+_limiters: Dict[str, Optional[TokenBucket]] = {}
+_limiters_lock = threading.Lock()
+
+def _create_limiter(name: str) -> Optional[TokenBucket]:
+    if name == "clay_daily":
+        if CLAY_DAILY_LIMIT <= 0:
+            return None
+        per_minute, burst = CLAY_DAILY_LIMIT / (24 * 60.0), float(CLAY_DAILY_LIMIT)
+    else:
+        per_minute = RATE_LIMITS_PER_MINUTE.get(name, 0.0)
+        if per_minute <= 0:
+            return None
+        # Token budgets are spent in large chunks, so allow a few seconds' worth at once
+        burst = per_minute / 10.0 if name == "openai_tokens" else None
+    if RATE_LIMIT_DB:
+        return SqliteTokenBucket(name, per_minute, burst)
+    return TokenBucket(name, per_minute, burst)
+
+def get_limiter(name: str) -> Optional[TokenBucket]:
+    """
+    Get the process-wide limiter for a provider quota, creating it on first use.
+
+    Args:
+        name: "openai", "openai_tokens", "tavily", "clay" or "clay_daily"
+
+    Returns:
+        Shared TokenBucket, or None if the quota is not limited
+    """
+    if name not in _limiters:
+        with _limiters_lock:
+            if name not in _limiters:
+                _limiters[name] = _create_limiter(name)
+    return _limiters[name]
+
+def throttle(name: str, amount: float = 1.0, max_wait: Optional[float] = None) -> None:
+    """
+    Wait for a slot in a provider quota; a no-op if the quota is not limited.
+
+    Args:
+        name: Quota name, see get_limiter
+        amount: Requests or tokens to take
+        max_wait: Raise RateLimitExceeded instead of waiting longer than this
+    """
+    limiter = get_limiter(name)
+    if limiter is not None:
+        limiter.acquire(amount, max_wait)
+
+async def athrottle(name: str, amount: float = 1.0, max_wait: Optional[float] = None) -> None:
+    """Async version of throttle."""
+    limiter = get_limiter(name)
+    if limiter is not None:
+        await limiter.aacquire(amount, max_wait)
+
+def charge(name: str, amount: float) -> None:
+    """
+    Account for usage only known after a call (e.g. completion tokens) without waiting.
+
+    Later callers absorb the resulting wait.
+    """
+    limiter = get_limiter(name)
+    if limiter is not None and amount:
+        limiter.reserve(amount)
+
+def penalize(name: str, seconds: float) -> bool:
+    """
+    Hold back all callers of a provider quota after it signalled rate limiting.
+
+    Returns:
+        True if the quota is limited and callers will wait, False otherwise
+    """
+    limiter = get_limiter(name)
+    if limiter is None:
+        return False
+    logger.warning(f"{name} is rate limiting requests; pausing calls for {seconds:.1f}s")
+    limiter.penalize(seconds)
+    return True
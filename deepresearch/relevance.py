@@ -0,0 +1,138 @@
+import re
+import math
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from deepresearch.utils import extract_result_linkedin_urls
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Heuristic bonuses added to the normalized BM25 score
+LINKEDIN_PROFILE_BONUS = 1.0
+ROLE_TITLE_BONUS = 0.5
+PERSON_PAGE_BONUS = 0.25
+
+# Words that carry no signal about whether a result matches the criteria
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "of",
+    "on", "or", "that", "the", "their", "this", "to", "who", "with", "find", "looking", "leads", "lead"
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Job titles and seniority markers that suggest the result names a person in a role
+ROLE_PATTERN = re.compile(
+    r"\b(?:ceo|cto|cfo|coo|cmo|cio|ciso|chief \w+ officer|founder|co-founder|cofounder|owner|partner|president|"
+    r"vice president|vp|svp|evp|head of|director|manager|lead|principal|engineer|architect|"
+    r"recruiter|consultant|executive)\b",
+    re.IGNORECASE
+)
+
+# Pages that usually list people: team pages, leadership bios, speaker lists, interviews
+PERSON_PAGE_PATTERN = re.compile(
+    r"\b(?:team|leadership|management|board|about us|our people|speakers?|interview|profile|bio|"
+    r"appointed|joins|hired|announces)\b",
+    re.IGNORECASE
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of text without stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def bm25_scores(query: Sequence[str], documents: Sequence[Sequence[str]]) -> List[float]:
+    """
+    Score tokenized documents against a tokenized query with Okapi BM25.
+
+    Document frequencies are computed over the given documents, so scores are
+    relative to the batch being ranked.
+
+    Args:
+        query: Query tokens
+        documents: Tokens of each document
+
+    Returns:
+        One score per document
+    """
+    if not documents:
+        return []
+    average_length = sum(len(document) for document in documents) / len(documents) or 1.0
+    document_frequency = Counter(token for document in documents for token in set(document))
+    idf = {
+        token: math.log(1 + (len(documents) - document_frequency[token] + 0.5) / (document_frequency[token] + 0.5))
+        for token in set(query)
+    }
+
+    scores = []
+    for document in documents:
+        frequencies = Counter(document)
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(document) / average_length)
+        score = 0.0
+        for token in set(query):
+            frequency = frequencies.get(token, 0)
+            if frequency:
+                score += idf[token] * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+        scores.append(score)
+    return scores
+
+def score_results(results: List[Dict[str, Any]], research_topic: str) -> List[float]:
+    """
+    Score search results by how likely they are to contain matching leads.
+
+    The score is the BM25 score against the lead criteria, normalized to [0, 1]
+    within the batch, plus bonuses for LinkedIn profile URLs, job titles and
+    pages that typically list people.
+
+    Args:
+        results: Search results with title, content and url
+        research_topic: Lead criteria
+
+    Returns:
+        One score per result
+    """
+    query = tokenize(research_topic)
+    documents = [tokenize(f"{result.get('title', '')} {result.get('content', '')}") for result in results]
+    relevance = bm25_scores(query, documents)
+    top = max(relevance, default=0.0) or 1.0
+
+    scores = []
+    for result, score in zip(results, relevance):
+        text = f"{result.get('title', '')}\n{result.get('content', '')}"
+        score /= top
+        if extract_result_linkedin_urls(result):
+            score += LINKEDIN_PROFILE_BONUS
+        if ROLE_PATTERN.search(text):
+            score += ROLE_TITLE_BONUS
+        if PERSON_PAGE_PATTERN.search(result.get("title", "")):
+            score += PERSON_PAGE_BONUS
+        scores.append(score)
+    return scores
+
+def rank_results(results: List[Dict[str, Any]], research_topic: str, min_score: float = 0.0,
+                 max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Rank search results by lead relevance and drop the unlikely ones.
+
+    Args:
+        results: Search results with title, content and url
+        research_topic: Lead criteria
+        min_score: Results scoring below this are dropped
+        max_results: Keep at most this many results (None or 0 keeps all that pass)
+
+    Returns:
+        Results scoring at least min_score, best first
+    """
+    scored: List[Tuple[float, int, Dict[str, Any]]] = [
+        (score, index, result) for index, (score, result) in enumerate(zip(score_results(results, research_topic), results))
+    ]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    ranked = [result for score, _, result in scored if score >= min_score]
+    if max_results:
+        ranked = ranked[:max_results]
+    if len(ranked) < len(results):
+        logger.debug(f"Relevance filter kept {len(ranked)} of {len(results)} search results")
+    return ranked
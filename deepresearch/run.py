@@ -1,51 +1,124 @@
 import argparse
-import os
+import asyncio
+import json
+import logging
+import uuid
 import threading
 import sys
-from dotenv import load_dotenv
 
-from deepresearch.graph import graph
-from deepresearch.linkedin_service import start_service
+# Heavy modules (the graph with LangChain and LangGraph, Flask, HTTP clients) are
+# imported only on the code paths that use them, so --help and the service-only
+# startup stay fast
+
+async def _arun_checkpointed_batch(jobs, output, concurrency, max_loops, batch_id, enrichment_wait):
+    """Run a batch on the async graph with an async checkpointer open for its duration."""
+    from deepresearch.batch import arun_batch
+    from deepresearch.checkpoint import async_checkpointer
+    from deepresearch.graph import compile_graph
+    
+    async with async_checkpointer() as checkpointer:
+        return await arun_batch(jobs, output, concurrency=concurrency, max_loops=max_loops,
+                                graph=compile_graph(checkpointer), batch_id=batch_id,
+                                enrichment_wait=enrichment_wait)
 
 def main():
     """Main entry point for running the lead generation agent."""
-    # Load environment variables from .env file if it exists
-    load_dotenv()
-    
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Lead Generation Agent with LinkedIn Access")
     parser.add_argument("lead_criteria", type=str, nargs="?", help="Criteria for lead generation (e.g., 'startup CTOs in fintech')")
     parser.add_argument("--linkedin-service", action="store_true", help="Start the LinkedIn service")
     parser.add_argument("--port", type=int, default=8080, help="Port for the LinkedIn service")
     parser.add_argument("--max-loops", type=int, default=3, help="Maximum number of research loops")
+    parser.add_argument("--batch", type=str, help="JSONL file of lead criteria to run concurrently ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent runs in batch mode")
+    parser.add_argument("--output", type=str, default="-", help="JSONL file for batch results ('-' for stdout)")
+    parser.add_argument("--metrics-out", type=str, help="Write per-node and per-run metrics as JSON to this file")
+    parser.add_argument("--enrichment-wait", type=float, default=0.0, help="Seconds each research loop waits for pending Clay enrichments")
+    parser.add_argument("--run-id", type=str, help="Id of the run (or batch) for checkpointing; pass the id of an interrupted run to resume it")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not checkpoint run state after each step")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run batch jobs on a single event loop using the async graph")
     
     args = parser.parse_args()
     
+    # Load environment variables from .env file if it exists
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     # Start LinkedIn service if requested
     if args.linkedin_service:
+        from deepresearch.linkedin_service import start_service
+        
         print(f"Starting LinkedIn service on port {args.port}...")
         service_thread = threading.Thread(target=start_service, args=(args.port,))
         service_thread.daemon = True
         service_thread.start()
         print(f"LinkedIn service is running at http://localhost:{args.port}")
-        print("Use Ctrl+C to stop the service.")
         
+        # With criteria or a batch, keep serving in the background so Clay callbacks
+        # reach runs in this process while they wait for enrichment
+        if not (args.batch or args.lead_criteria):
+            print("Use Ctrl+C to stop the service.")
+            try:
+                # Keep the main thread alive
+                service_thread.join()
+            except KeyboardInterrupt:
+                print("\nShutting down LinkedIn service...")
+                sys.exit(0)
+    
+    # Checkpointed runs can be resumed by passing the same run id again
+    run_id = args.run_id or uuid.uuid4().hex
+    
+    # Run lead generation for a batch of criteria if requested
+    if args.batch:
+        from deepresearch.batch import arun_batch, read_criteria, run_batch
+        from deepresearch.checkpoint import get_checkpointer
+        from deepresearch.graph import compile_graph, get_graph
+        
+        input_stream = sys.stdin if args.batch == "-" else open(args.batch, "r")
+        output_stream = sys.stdout if args.output == "-" else open(args.output, "a")
+        if not args.no_checkpoint:
+            print(f"Batch run id: {run_id} (pass --run-id {run_id} to resume)", file=sys.stderr)
         try:
-            # Keep the main thread alive
-            service_thread.join()
-        except KeyboardInterrupt:
-            print("\nShutting down LinkedIn service...")
-            sys.exit(0)
+            if args.use_async and args.no_checkpoint:
+                counts = asyncio.run(arun_batch(read_criteria(input_stream), output_stream,
+                                                concurrency=args.workers, max_loops=args.max_loops, graph=get_graph(),
+                                                enrichment_wait=args.enrichment_wait))
+            elif args.use_async:
+                counts = asyncio.run(_arun_checkpointed_batch(read_criteria(input_stream), output_stream,
+                                                              args.workers, args.max_loops, run_id,
+                                                              args.enrichment_wait))
+            else:
+                counts = run_batch(read_criteria(input_stream), output_stream,
+                                   workers=args.workers, max_loops=args.max_loops,
+                                   graph=get_graph() if args.no_checkpoint else compile_graph(get_checkpointer()),
+                                   batch_id=run_id, enrichment_wait=args.enrichment_wait)
+        finally:
+            if input_stream is not sys.stdin:
+                input_stream.close()
+            if output_stream is not sys.stdout:
+                output_stream.close()
+        print(f"Batch complete: {counts['succeeded']} succeeded, {counts['failed']} failed", file=sys.stderr)
     
     # Run the lead generation agent if criteria are provided
-    if args.lead_criteria:
+    elif args.lead_criteria:
+        from deepresearch.cache import get_search_cache
+        from deepresearch.checkpoint import get_checkpointer, invoke_resumable
+        from deepresearch.graph import compile_graph, get_graph
+        
         print(f"Starting lead generation for: {args.lead_criteria}")
         print(f"Maximum search loops: {args.max_loops}")
         
-        # Run the graph
-        result = graph.invoke(
+        if not args.no_checkpoint:
+            print(f"Run id: {run_id} (pass --run-id {run_id} to resume)")
+        
+        # Run the graph, resuming from the last checkpoint of this run id if there is one
+        result = invoke_resumable(
+            get_graph() if args.no_checkpoint else compile_graph(get_checkpointer()),
             {"research_topic": args.lead_criteria},
-            {"configurable": {"max_web_research_loops": args.max_loops}}
+            {"configurable": {"max_web_research_loops": args.max_loops, "run_id": run_id, "thread_id": run_id,
+                              "enrichment_wait_seconds": args.enrichment_wait}}
         )
         
         # Print the result
@@ -54,8 +127,22 @@ def main():
         print("="*50)
         print(result["running_summary"])
         print("="*50)
+        print(f"Stopped: {result.get('stop_reason', 'completed')}")
+        
+        # Report search cache effectiveness for TTL tuning
+        cache_stats = get_search_cache().stats()
+        print(f"Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['size']} entries)")
     elif not args.linkedin_service:
         parser.print_help()
+        return
+    
+    # Export instrumentation collected during the run(s)
+    if args.metrics_out:
+        from deepresearch.metrics import metrics
+        with open(args.metrics_out, "w") as f:
+            json.dump(metrics.snapshot(), f, indent=2)
+        print(f"Metrics written to {args.metrics_out}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
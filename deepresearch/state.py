@@ -1,14 +1,50 @@
+import operator
 from typing import Dict, List, Optional, TypedDict
+from typing_extensions import Annotated
+
+class LeadRecord(TypedDict, total=False):
+    """A lead collected during research."""
+    name: str
+    title: str
+    company: str
+    linkedin_id: str
+    source_urls: List[str]
+    notes: str
+
+def merge_digests(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Reducer for keyed digests: an update adds new keys and replaces the digests of existing ones."""
+    return {**(left or {}), **(right or {})}
 
 class SummaryState(TypedDict, total=False):
-    """State for the summary graph."""
+    """State for the summary graph.
+    
+    Search results, profile data and the leads collected so far live in the
+    blob store; state carries their digests, and the list and dict fields have
+    reducers so nodes return only what changed. running_summary and leads are
+    only filled in by finalize_leads.
+    """
     research_topic: str
     search_query: str
+    search_queries: List[str]
     running_summary: str
     research_loop_count: int
-    web_research_results: List[str]
-    sources_gathered: List[str]
-    linkedin_profiles: List[Dict[str, str]]
+    # Digest of the leads collected so far (incremental summarization)
+    leads_digest: str
+    # Digest of the latest LLM-written summary (full re-summarization)
+    summary_digest: str
+    # Digest of the latest loop's formatted search results
+    web_research_digest: str
+    # Digest of each loop's source list
+    source_digests: Annotated[List[str], operator.add]
+    # Normalized LinkedIn profile id -> digest of its latest profile data
+    profile_digests: Annotated[Dict[str, str], merge_digests]
+    leads: List[LeadRecord]
+    # Digests of the profile versions already sent to the summarizer
+    summarized_profiles: Annotated[List[str], operator.add]
+    # Digest of each loop's newly seen result URLs
+    seen_url_digests: Annotated[List[str], operator.add]
+    loop_yields: List[Dict[str, int]]
+    stop_reason: str
 
 class SummaryStateInput(TypedDict):
     """Input state for the summary graph."""
@@ -17,4 +53,6 @@ class SummaryStateInput(TypedDict):
 class SummaryStateOutput(TypedDict):
     """Output state for the summary graph."""
     research_topic: str
-    running_summary: str
\ No newline at end of file
+    running_summary: str
+    leads: List[LeadRecord]
+    stop_reason: str
\ No newline at end of file
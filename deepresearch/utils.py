@@ -1,55 +1,58 @@
 import os
 import re
 import json
-import requests
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import quote
+
+from deepresearch.cache import get_search_cache, make_cache_key
+from deepresearch.context_budget import truncate_to_tokens
+from deepresearch.enrichment import enrichment
+from deepresearch.http_client import arequest, get_session
+from deepresearch.metrics import instrument, map_in_context, record_cache, record_http
+from deepresearch.profile_store import CLAY_PENDING_TTL, get_profile_store, normalize_profile_id
+from deepresearch.rate_limit import athrottle, throttle
 
-# Directory to store received LinkedIn profiles
-PROFILES_DIR = "linkedin_profiles"
-os.makedirs(PROFILES_DIR, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-def tavily_search(query: str, max_results: int = 5) -> List[Dict[str, str]]:
+def normalize_query(query: str) -> str:
     """
-    Search the web using Tavily API.
+    Normalize a search query for cache lookups.
     
     Args:
         query: The search query
-        max_results: Maximum number of results to return
         
     Returns:
-        List of search results as dictionaries with title, content, and url
+        Lowercased query with surrounding quotes and repeated whitespace removed
     """
-    import os
-    import requests
-    
+    return " ".join(query.strip().strip('"\'').lower().split())
+
+TAVILY_SEARCH_URL = os.environ.get("TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+
+def _tavily_params(query: str, max_results: int, search_depth: str) -> Dict[str, Any]:
+    """Build the Tavily request parameters, checking the API key is configured."""
     api_key = os.environ.get("TAVILY_API_KEY")
     if not api_key:
         raise ValueError("Tavily API key not found. Please set the TAVILY_API_KEY environment variable.")
     
-    search_url = "https://api.tavily.com/search"
-    params = {
+    return {
         "api_key": api_key,
         "query": query,
-        "search_depth": "advanced",
+        "search_depth": search_depth,
         "include_answer": False,
         "include_images": False,
         "max_results": max_results
     }
+
+def _parse_tavily_response(status_code: int, text: str, payload_loader) -> List[Dict[str, str]]:
+    """Convert a Tavily response into title/content/url result dictionaries."""
+    if status_code != 200:
+        raise Exception(f"Tavily search failed with status code {status_code}: {text}")
     
-    response = requests.get(search_url, params=params)
-    if response.status_code != 200:
-        raise Exception(f"Tavily search failed with status code {response.status_code}: {response.text}")
-    
-    results = response.json().get("results", [])
+    results = payload_loader().get("results", [])
     search_results = []
     
     for result in results:
@@ -61,6 +64,157 @@ def tavily_search(query: str, max_results: int = 5) -> List[Dict[str, str]]:
     
     return search_results
 
+@instrument("tavily_search")
+def tavily_search(query: str, max_results: int = 5, search_depth: str = "advanced", 
+                  use_cache: bool = True) -> List[Dict[str, str]]:
+    """
+    Search the web using Tavily API.
+    
+    Results are served from the on-disk search cache when an unexpired entry
+    exists for the same normalized query, max_results and search_depth.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        search_depth: Tavily search depth ("basic" or "advanced")
+        use_cache: Whether to read from and write to the search cache
+        
+    Returns:
+        List of search results as dictionaries with title, content, and url
+    """
+    cache_key = make_cache_key("tavily", normalize_query(query), max_results, search_depth)
+    if use_cache:
+        cached_results = get_search_cache().get(cache_key)
+        record_cache(cached_results is not None)
+        if cached_results is not None:
+            logger.info(f"Search cache hit for query: {query}")
+            return cached_results
+    
+    params = _tavily_params(query, max_results, search_depth)
+    response = get_session("tavily").get(TAVILY_SEARCH_URL, params=params)
+    record_http(response)
+    search_results = _parse_tavily_response(response.status_code, response.text, response.json)
+    
+    if use_cache:
+        get_search_cache().set(cache_key, search_results)
+    
+    return search_results
+
+@instrument("tavily_search")
+async def atavily_search(query: str, max_results: int = 5, search_depth: str = "advanced", 
+                         use_cache: bool = True) -> List[Dict[str, str]]:
+    """
+    Async version of tavily_search using the shared async HTTP client.
+    
+    Search cache reads and writes run in a worker thread, so SQLite I/O does
+    not block other runs on the event loop.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        search_depth: Tavily search depth ("basic" or "advanced")
+        use_cache: Whether to read from and write to the search cache
+        
+    Returns:
+        List of search results as dictionaries with title, content, and url
+    """
+    cache_key = make_cache_key("tavily", normalize_query(query), max_results, search_depth)
+    if use_cache:
+        cached_results = await asyncio.to_thread(lambda: get_search_cache().get(cache_key))
+        record_cache(cached_results is not None)
+        if cached_results is not None:
+            logger.info(f"Search cache hit for query: {query}")
+            return cached_results
+    
+    params = _tavily_params(query, max_results, search_depth)
+    response = await arequest("tavily", "GET", TAVILY_SEARCH_URL, params=params)
+    record_http(response)
+    search_results = _parse_tavily_response(response.status_code, response.text, response.json)
+    
+    if use_cache:
+        await asyncio.to_thread(lambda: get_search_cache().set(cache_key, search_results))
+    
+    return search_results
+
+def merge_search_results(result_lists: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    Merge the results of several searches, keeping the first result per URL.
+    
+    Args:
+        result_lists: Search results for each query
+        
+    Returns:
+        Merged list of search results without duplicate URLs
+    """
+    seen_urls = set()
+    merged_results = []
+    for results in result_lists:
+        for result in results:
+            url = result.get("url", "")
+            if url in seen_urls:
+                continue
+            if url:
+                seen_urls.add(url)
+            merged_results.append(result)
+    return merged_results
+
+def _merge_query_outcomes(queries: List[str], outcomes: List[Any]) -> List[Dict[str, str]]:
+    """Merge per-query results, logging failed queries and raising only if all failed."""
+    result_lists = []
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Search failed for query: {query}. Error: {str(outcome)}")
+        else:
+            result_lists.append(outcome)
+    if queries and not result_lists:
+        raise outcomes[0]
+    return merge_search_results(result_lists)
+
+def multi_search(queries: List[str], max_results: int = 5, max_workers: int = 4) -> List[Dict[str, str]]:
+    """
+    Run several Tavily searches concurrently and merge their results.
+    
+    A failed query is logged and skipped; an exception is raised only if
+    every query fails.
+    
+    Args:
+        queries: Search queries
+        max_results: Maximum number of results per query
+        max_workers: Maximum number of searches in flight
+        
+    Returns:
+        Merged list of search results without duplicate URLs
+    """
+    def search(query: str):
+        try:
+            return tavily_search(query, max_results=max_results)
+        except Exception as e:
+            return e
+    
+    if len(queries) <= 1:
+        outcomes = [search(query) for query in queries]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+            outcomes = list(map_in_context(executor, search, queries))
+    return _merge_query_outcomes(queries, outcomes)
+
+async def amulti_search(queries: List[str], max_results: int = 5) -> List[Dict[str, str]]:
+    """
+    Async version of multi_search.
+    
+    Args:
+        queries: Search queries
+        max_results: Maximum number of results per query
+        
+    Returns:
+        Merged list of search results without duplicate URLs
+    """
+    outcomes = await asyncio.gather(
+        *(atavily_search(query, max_results=max_results) for query in queries),
+        return_exceptions=True
+    )
+    return _merge_query_outcomes(queries, list(outcomes))
+
 def format_sources(sources: List[Dict[str, str]]) -> str:
     """Format the sources for output.
     
@@ -76,12 +230,14 @@ def format_sources(sources: List[Dict[str, str]]) -> str:
     return "\n".join(formatted_sources)
 
 def deduplicate_and_format_sources(sources: List[Dict[str, str]], 
-                                  max_tokens_per_source: int = 1000) -> str:
+                                  max_tokens_per_source: int = 1000,
+                                  model: Optional[str] = None) -> str:
     """Deduplicate sources and format them for the model.
     
     Args:
         sources: List of sources with title, content, and url
         max_tokens_per_source: Maximum tokens per source to include
+        model: OpenAI model whose tokenizer measures the content
         
     Returns:
         Formatted string with sources content
@@ -101,15 +257,34 @@ def deduplicate_and_format_sources(sources: List[Dict[str, str]],
         content = source.get("content", "")
         url = source.get("url", "")
         
-        # Truncate content if needed based on rough token estimate
-        if content and len(content) > max_tokens_per_source * 4:  # Rough char to token ratio
-            content = content[:max_tokens_per_source * 4] + "..."
+        # Truncate content to the per-source token limit
+        if content:
+            content = truncate_to_tokens(content, max_tokens_per_source, model)
         
         formatted_source = f"SOURCE {i}:\nTitle: {title}\nURL: {url}\nContent: {content}\n"
         formatted_sources.append(formatted_source)
     
     return "\n\n".join(formatted_sources)
 
+# LinkedIn profile URLs on any subdomain (www, uk, de, mobile, ...), with or without a
+# scheme; matched on lowercased text so the pattern starts with a literal the regex
+# engine can scan for quickly. The slug may contain unicode letters, dots and
+# percent-escapes, and whatever follows it (trailing slash, query string, fragment) is dropped
+LINKEDIN_PROFILE_PATTERN = re.compile(r"linkedin\.com/in/([\w%.-]+)")
+
+@lru_cache(maxsize=65536)
+def canonical_linkedin_url(profile_url: str) -> str:
+    """
+    Canonical form of a LinkedIn profile URL.
+    
+    Args:
+        profile_url: LinkedIn profile URL in any form, or a bare slug
+        
+    Returns:
+        https://www.linkedin.com/in/<profile id>, with the id percent-encoded
+    """
+    return f"https://www.linkedin.com/in/{quote(normalize_profile_id(profile_url), safe='-_.')}"
+
 def extract_linkedin_urls(text: str) -> List[str]:
     """
     Extract LinkedIn profile URLs from text.
@@ -118,12 +293,58 @@ def extract_linkedin_urls(text: str) -> List[str]:
         text: Text to extract URLs from
         
     Returns:
-        List of LinkedIn profile URLs
+        Canonical LinkedIn profile URLs, one per profile, in order of appearance
     """
-    # Pattern to match LinkedIn profile URLs
-    linkedin_pattern = r'https?://(?:www\.)?linkedin\.com/in/[a-zA-Z0-9_-]+'
-    return re.findall(linkedin_pattern, text)
+    urls = {}
+    lowered = text.lower()
+    for match in LINKEDIN_PROFILE_PATTERN.finditer(lowered):
+        # Skip look-alike hosts such as notlinkedin.com
+        start = match.start()
+        if start and (lowered[start - 1].isalnum() or lowered[start - 1] in "-_"):
+            continue
+        # A trailing dot ends the sentence rather than the slug
+        slug = match.group(1).rstrip(".")
+        if slug and normalize_profile_id(slug) != "unknown":
+            urls.setdefault(canonical_linkedin_url(slug), None)
+    return list(urls)
 
+def extract_result_linkedin_urls(result: Dict[str, Any]) -> List[str]:
+    """
+    Extract LinkedIn profile URLs from the url, title and content of a search result.
+    
+    Args:
+        result: Search result with url, title and content
+        
+    Returns:
+        Canonical LinkedIn profile URLs, one per profile
+    """
+    text = "\n".join((result.get("url") or "", result.get("title") or "", result.get("content") or ""))
+    return extract_linkedin_urls(text)
+
+def _clay_request(profile_url: str) -> Tuple[str, Dict[str, str]]:
+    """Build the Clay webhook URL and request body for a profile."""
+    clay_webhook_url = os.environ.get("CLAY_WEBHOOK_URL")
+    if not clay_webhook_url:
+        raise ValueError("Clay webhook URL not found. Please set the CLAY_WEBHOOK_URL environment variable.")
+    
+    # Get webhook callback URL (this would be set up with ngrok in production)
+    callback_url = os.environ.get("CALLBACK_URL", "http://localhost:8080/webhook/clay-callback")
+    
+    return clay_webhook_url, {"url": profile_url, "callback_url": callback_url}
+
+def _parse_clay_response(profile_url: str, response) -> Dict[str, Any]:
+    """Convert a Clay webhook response into a result dictionary."""
+    if response.status_code == 200:
+        logger.info(f"Successfully sent LinkedIn profile to Clay: {profile_url}")
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return {"status": "success", "message": "Request accepted by Clay"}
+    else:
+        logger.warning(f"Failed to send LinkedIn profile to Clay: {profile_url}. Status: {response.status_code}")
+        return {"error": f"Request failed with status code: {response.status_code}"}
+
+@instrument("send_linkedin_profile_to_clay")
 def send_linkedin_profile_to_clay(profile_url: str) -> Dict[str, Any]:
     """
     Send a LinkedIn profile URL to Clay for enrichment.
@@ -134,32 +355,38 @@ def send_linkedin_profile_to_clay(profile_url: str) -> Dict[str, Any]:
     Returns:
         Response from Clay API
     """
-    clay_webhook_url = os.environ.get("CLAY_WEBHOOK_URL")
-    if not clay_webhook_url:
-        raise ValueError("Clay webhook URL not found. Please set the CLAY_WEBHOOK_URL environment variable.")
+    clay_webhook_url, payload = _clay_request(profile_url)
     
     try:
-        # Get webhook callback URL (this would be set up with ngrok in production)
-        callback_url = os.environ.get("CALLBACK_URL", "http://localhost:8080/webhook/clay-callback")
-        
+        # Count against the daily Clay cap, failing fast once it is spent
+        throttle("clay_daily", max_wait=0)
         # Send the profile URL to Clay
-        response = requests.post(
-            clay_webhook_url,
-            json={
-                "url": profile_url,
-                "callback_url": callback_url
-            }
-        )
-        
-        if response.status_code == 200:
-            logger.info(f"Successfully sent LinkedIn profile to Clay: {profile_url}")
-            try:
-                return response.json()
-            except json.JSONDecodeError:
-                return {"status": "success", "message": "Request accepted by Clay"}
-        else:
-            logger.warning(f"Failed to send LinkedIn profile to Clay: {profile_url}. Status: {response.status_code}")
-            return {"error": f"Request failed with status code: {response.status_code}"}
+        response = get_session("clay").post(clay_webhook_url, json=payload)
+        record_http(response)
+        return _parse_clay_response(profile_url, response)
+            
+    except Exception as e:
+        logger.error(f"Error sending LinkedIn profile to Clay: {profile_url}. Error: {str(e)}")
+        return {"error": str(e)}
+
+@instrument("send_linkedin_profile_to_clay")
+async def asend_linkedin_profile_to_clay(profile_url: str) -> Dict[str, Any]:
+    """
+    Async version of send_linkedin_profile_to_clay.
+    
+    Args:
+        profile_url: LinkedIn profile URL
+        
+    Returns:
+        Response from Clay API
+    """
+    clay_webhook_url, payload = _clay_request(profile_url)
+    
+    try:
+        await athrottle("clay_daily", max_wait=0)
+        response = await arequest("clay", "POST", clay_webhook_url, json=payload)
+        record_http(response)
+        return _parse_clay_response(profile_url, response)
             
     except Exception as e:
         logger.error(f"Error sending LinkedIn profile to Clay: {profile_url}. Error: {str(e)}")
@@ -167,31 +394,78 @@ def send_linkedin_profile_to_clay(profile_url: str) -> Dict[str, Any]:
 
 def save_linkedin_profile(profile_data: Dict[str, Any]) -> str:
     """
-    Save LinkedIn profile data to a file.
+    Save LinkedIn profile data to the profile store.
     
     Args:
         profile_data: Profile data returned from Clay
         
     Returns:
-        Path to the saved file
+        Normalized profile id the data was saved under
     """
-    # Generate a filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    profile_id = profile_data.get('url', '').split('/')[-1] if 'url' in profile_data else 'unknown'
-    filename = f"{profile_id}_{timestamp}.json"
-    file_path = os.path.join(PROFILES_DIR, filename)
+    profile_id = get_profile_store().put(profile_data)
+    enrichment.resolve([profile_data])
     
-    # Save the profile data
-    with open(file_path, 'w') as f:
-        json.dump(profile_data, f, indent=2)
+    logger.info(f"Saved LinkedIn profile data: {profile_id}")
+    return profile_id
+
+def _pending_profile(profile_url: str) -> Dict[str, Any]:
+    """Placeholder returned while Clay enrichment is outstanding."""
+    # Clay doesn't immediately return profile data (which is the usual case);
+    # the actual data arrives later via the webhook callback.
+    return {
+        "url": profile_url,
+        "status": "pending",
+        "message": "Profile data requested from Clay. Will be available once Clay calls back."
+    }
+
+def _profile_error(profile_url: str, error: Exception) -> Dict[str, Any]:
+    """Error entry for a profile whose lookup failed."""
+    logger.error(f"Error getting LinkedIn profile data: {profile_url}. Error: {str(error)}")
+    return {"url": profile_url, "status": "error", "error": str(error)}
+
+def _claim_enrichment(profile_url: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Look up a profile and, if it is missing, claim the right to request it from Clay.
     
-    logger.info(f"Saved LinkedIn profile data: {filename}")
-    return file_path
+    Returns:
+        Tuple of the stored profile (or None) and whether this caller should send
+        the Clay request; duplicates of an in-flight request are coalesced onto it
+    """
+    store = get_profile_store()
+    existing_profile = store.get(profile_url)
+    if existing_profile is not None:
+        return existing_profile, False
+    if not store.claim_enrichment(profile_url, CLAY_PENDING_TTL):
+        logger.debug(f"Enrichment already in flight for LinkedIn profile: {profile_url}")
+        return None, False
+    # The callback may have landed between the lookup and the claim
+    existing_profile = store.get(profile_url)
+    if existing_profile is not None:
+        store.release_enrichment(profile_url)
+        return existing_profile, False
+    return None, True
+
+def _finish_enrichment(profile_url: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Placeholder for a profile once its Clay request was sent.
+    
+    Only requests Clay accepted are pending. A failed request (an error status,
+    a network error or the daily cap) gets an error entry, so runs do not wait
+    for a callback that will never come, and its claim is released so a later
+    run can retry it.
+    """
+    if "error" in response:
+        get_profile_store().release_enrichment(profile_url)
+        return _profile_error(profile_url, RuntimeError(f"Clay request failed: {response['error']}"))
+    return _pending_profile(profile_url)
 
 def get_linkedin_profile_data(profile_url: str) -> Dict[str, Any]:
     """
     Get LinkedIn profile data either from Clay or from cached data.
     
+    At most one Clay request is outstanding per profile (until CLAY_PENDING_TTL
+    passes), however many runs ask for it concurrently.
+    
     Args:
         profile_url: LinkedIn profile URL
         
@@ -199,22 +473,91 @@ def get_linkedin_profile_data(profile_url: str) -> Dict[str, Any]:
         LinkedIn profile data
     """
     # First check if we already have this profile
-    profile_id = profile_url.split('/')[-1]
-    existing_profiles = [f for f in os.listdir(PROFILES_DIR) if f.startswith(profile_id) and f.endswith('.json')]
-    
-    if existing_profiles:
-        # Use the most recent profile data
-        latest_profile = sorted(existing_profiles)[-1]
-        with open(os.path.join(PROFILES_DIR, latest_profile), 'r') as f:
-            return json.load(f)
+    existing_profile, should_send = _claim_enrichment(profile_url)
+    if existing_profile is not None:
+        return existing_profile
+    if not should_send:
+        return _pending_profile(profile_url)
     
     # If not found, request from Clay
-    response = send_linkedin_profile_to_clay(profile_url)
+    try:
+        response = send_linkedin_profile_to_clay(profile_url)
+    except Exception:
+        get_profile_store().release_enrichment(profile_url)
+        raise
+    return _finish_enrichment(profile_url, response)
+
+async def aget_linkedin_profile_data(profile_url: str) -> Dict[str, Any]:
+    """
+    Async version of get_linkedin_profile_data.
     
-    # If Clay doesn't immediately return profile data (which is the usual case),
-    # return a placeholder. The actual data would come via webhook callback.
-    return {
-        "url": profile_url,
-        "status": "pending",
-        "message": "Profile data requested from Clay. Will be available in subsequent runs."
-    }
\ No newline at end of file
+    Profile store lookups and claims run in a worker thread, so SQLite I/O
+    does not block other runs on the event loop.
+    
+    Args:
+        profile_url: LinkedIn profile URL
+        
+    Returns:
+        LinkedIn profile data
+    """
+    existing_profile, should_send = await asyncio.to_thread(_claim_enrichment, profile_url)
+    if existing_profile is not None:
+        return existing_profile
+    if not should_send:
+        return _pending_profile(profile_url)
+    
+    try:
+        response = await asend_linkedin_profile_to_clay(profile_url)
+    except Exception:
+        await asyncio.to_thread(get_profile_store().release_enrichment, profile_url)
+        raise
+    return await asyncio.to_thread(_finish_enrichment, profile_url, response)
+
+def get_linkedin_profiles_data(profile_urls: List[str], max_workers: int = 8) -> List[Dict[str, Any]]:
+    """
+    Get LinkedIn profile data for several URLs concurrently.
+    
+    Clay requests for uncached profiles are sent in parallel, with at most
+    max_workers in flight. A failure for one URL is returned as an error
+    entry for that URL and does not affect the others.
+    
+    Args:
+        profile_urls: LinkedIn profile URLs
+        max_workers: Maximum number of concurrent lookups
+        
+    Returns:
+        LinkedIn profile data, in the same order as profile_urls
+    """
+    if not profile_urls:
+        return []
+    
+    def fetch(profile_url: str) -> Dict[str, Any]:
+        try:
+            return get_linkedin_profile_data(profile_url)
+        except Exception as e:
+            return _profile_error(profile_url, e)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(profile_urls)))) as executor:
+        return list(map_in_context(executor, fetch, profile_urls))
+
+async def aget_linkedin_profiles_data(profile_urls: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+    """
+    Async version of get_linkedin_profiles_data, bounded by a semaphore.
+    
+    Args:
+        profile_urls: LinkedIn profile URLs
+        max_concurrency: Maximum number of concurrent lookups
+        
+    Returns:
+        LinkedIn profile data, in the same order as profile_urls
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def fetch(profile_url: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await aget_linkedin_profile_data(profile_url)
+            except Exception as e:
+                return _profile_error(profile_url, e)
+    
+    return list(await asyncio.gather(*(fetch(url) for url in profile_urls)))
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+WSGI entry point for the LinkedIn service.
+
+Run under a multi-worker server, e.g.:
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:8080 deepresearch.wsgi:app
+
+Each worker process keeps its own ingest queue and flushes it to the shared
+SQLite profile store; queued profiles are written when a worker shuts down.
+Research jobs are queued in a shared SQLite file, and each worker process
+runs up to JOB_WORKERS of them.
+"""
+
+from deepresearch.linkedin_service import app, configure_logging
+
+configure_logging()
+
+application = app
\ No newline at end of file